@@ -0,0 +1,364 @@
+"""DSP kernels for the built-in synth, JIT-compiled with Numba when available."""
+
+from functools import lru_cache
+
+import numpy as np
+
+try:
+    import numba as _numba
+except ImportError:
+    _numba = None
+
+NUMBA_AVAILABLE = _numba is not None
+
+# Voice envelope stages.
+STAGE_ATTACK = 0
+STAGE_DECAY = 1
+STAGE_SUSTAIN = 2
+STAGE_PEDAL = 3
+STAGE_RELEASE = 4
+STAGE_OFF = 5
+
+
+def _njit(func, signature):
+    """Compile `func` eagerly for `signature`, or return None without Numba.
+
+    Compiling at import (and caching to disk) keeps JIT work off the audio thread. Bounds
+    checks stay off even if NUMBA_BOUNDSCHECK is set, and kernels release the GIL so the
+    GUI thread is not stalled while the audio callback renders.
+    """
+    if _numba is None:
+        return None
+    return _numba.njit(signature, cache=True, fastmath=True, boundscheck=False, nogil=True)(func)
+
+
+def _render_voices_loop(out, envelopes, tables, keys, phases, freqs, gains, dt):
+    size = tables.shape[1] - 1
+    for v in range(keys.shape[0]):
+        table = tables[keys[v]]
+        gain = gains[v]
+        # Table position advances by a fixed step per sample; phases are in [0, 1).
+        pos = phases[v] * size
+        step = freqs[v] * dt * size
+        for i in range(out.shape[0]):
+            i0 = int(pos)
+            frac = pos - i0
+            a = table[i0]
+            b = table[i0 + 1]
+            out[i] += (a + frac * (b - a)) * envelopes[v, i] * gain
+            pos += step
+            while pos >= size:
+                pos -= size
+
+
+def _render_voices_numpy(out, envelopes, tables, keys, phases, freqs, gains, dt):
+    size = tables.shape[1] - 1
+    offsets = np.arange(out.shape[0], dtype=np.float64) * dt
+    cycle = phases[:, None] + freqs[:, None] * offsets[None, :]
+    pos = (cycle - np.floor(cycle)) * size
+    i0 = pos.astype(np.int64)
+    frac = (pos - i0).astype(np.float32)
+    rows = keys[:, None]
+    # All voices are gathered and mixed as one (voices, samples) block, updated in place.
+    voices = tables[rows, i0]
+    i0 += 1
+    delta = tables[rows, i0]
+    delta -= voices
+    delta *= frac
+    voices += delta
+    voices *= envelopes
+    voices *= gains.astype(np.float32)[:, None]
+    out += voices.sum(axis=0)
+
+
+def _render_envelopes_loop(envelopes, slots, levels, stages, released,
+                           attack_step, decay_step, sustain_level, release_step, pedal_step, sustain_down):
+    for row in range(slots.shape[0]):
+        slot = slots[row]
+        level = levels[slot]
+        stage = stages[slot]
+        note_released = released[slot]
+        for i in range(envelopes.shape[1]):
+            if stage == STAGE_ATTACK:
+                if attack_step <= 0.0:
+                    level = 1.0
+                    stage = STAGE_DECAY
+                else:
+                    level += attack_step
+                    if level >= 1.0:
+                        level = 1.0
+                        stage = STAGE_DECAY
+                    envelopes[row, i] = level
+                    continue
+            if stage == STAGE_DECAY:
+                if decay_step <= 0.0:
+                    level = sustain_level
+                    stage = STAGE_SUSTAIN
+                else:
+                    level -= decay_step
+                    if level <= sustain_level:
+                        level = sustain_level
+                        stage = STAGE_SUSTAIN
+                    envelopes[row, i] = level
+                    continue
+            if stage == STAGE_SUSTAIN:
+                if not note_released:
+                    envelopes[row, i] = level
+                    continue
+                stage = STAGE_PEDAL if sustain_down else STAGE_RELEASE
+            if stage == STAGE_PEDAL or stage == STAGE_RELEASE:
+                step = pedal_step if stage == STAGE_PEDAL else release_step
+                if step <= 0.0:
+                    level = 0.0
+                    stage = STAGE_OFF
+                else:
+                    level -= step
+                    if level <= 0.0:
+                        level = 0.0
+                        stage = STAGE_OFF
+                    envelopes[row, i] = level
+                    continue
+            envelopes[row, i] = 0.0
+        levels[slot] = level
+        stages[slot] = stage
+
+
+_ramp = np.zeros(0, dtype=np.float32)
+
+
+def _ramp_to(n):
+    """Return the shared read-only ramp [1, 2, ..., n], growing it if needed."""
+    global _ramp
+    if n > len(_ramp):
+        _ramp = np.arange(1, n + 1, dtype=np.float32)
+        _ramp.flags.writeable = False
+    return _ramp[:n]
+
+
+def _render_envelopes_numpy(envelopes, slots, levels, stages, released,
+                            attack_step, decay_step, sustain_level, release_step, pedal_step, sustain_down):
+    # Fills each stage as one linear ramp written straight into the envelope row.
+    num_samples = envelopes.shape[1]
+    ramp = _ramp_to(num_samples)
+    for row, slot in enumerate(slots):
+        envelope = envelopes[row]
+        level = float(levels[slot])
+        stage = int(stages[slot])
+        note_released = bool(released[slot])
+        i = 0
+
+        while i < num_samples:
+            if stage == STAGE_ATTACK:
+                if attack_step <= 0:
+                    level = 1.0
+                    stage = STAGE_DECAY
+                    continue
+                step = attack_step
+                remaining = max(1, int(np.ceil((1.0 - level) / step)))
+                block = min(num_samples - i, remaining)
+                vals = envelope[i:i + block]
+                np.multiply(ramp[:block], step, out=vals)
+                vals += level
+                np.minimum(vals, 1.0, out=vals)
+                level = float(vals[-1])
+                i += block
+                if level >= 1.0:
+                    level = 1.0
+                    stage = STAGE_DECAY
+                continue
+
+            if stage == STAGE_DECAY:
+                if decay_step <= 0:
+                    level = sustain_level
+                    stage = STAGE_SUSTAIN
+                    continue
+                step = decay_step
+                remaining = max(1, int(np.ceil((level - sustain_level) / step)))
+                block = min(num_samples - i, remaining)
+                vals = envelope[i:i + block]
+                np.multiply(ramp[:block], -step, out=vals)
+                vals += level
+                np.maximum(vals, sustain_level, out=vals)
+                level = float(vals[-1])
+                i += block
+                if level <= sustain_level:
+                    level = sustain_level
+                    stage = STAGE_SUSTAIN
+                continue
+
+            if stage == STAGE_SUSTAIN:
+                if note_released:
+                    stage = STAGE_PEDAL if sustain_down else STAGE_RELEASE
+                    continue
+                envelope[i:] = level
+                i = num_samples
+                continue
+
+            if stage == STAGE_PEDAL or stage == STAGE_RELEASE:
+                step = pedal_step if stage == STAGE_PEDAL else release_step
+                if step <= 0:
+                    level = 0.0
+                    stage = STAGE_OFF
+                    continue
+                remaining = max(1, int(np.ceil(level / step)))
+                block = min(num_samples - i, remaining)
+                vals = envelope[i:i + block]
+                np.multiply(ramp[:block], -step, out=vals)
+                vals += level
+                np.maximum(vals, 0.0, out=vals)
+                level = float(vals[-1])
+                i += block
+                if level <= 0.0:
+                    level = 0.0
+                    stage = STAGE_OFF
+                continue
+
+            envelope[i:] = 0.0
+            i = num_samples
+
+        levels[slot] = level
+        stages[slot] = stage
+
+
+def _sosfilt_loop(buffer, sos, state, gain, cutoff):
+    for section in range(sos.shape[0]):
+        g = gain if section == 0 else 1.0
+        b0 = sos[section, 0]
+        b1 = sos[section, 1]
+        b2 = sos[section, 2]
+        a1 = sos[section, 4]
+        a2 = sos[section, 5]
+        s1 = state[section, 0]
+        s2 = state[section, 1]
+        for i in range(buffer.shape[0]):
+            x = buffer[i] * g
+            y = b0 * x + s1
+            s1 = b1 * x - a1 * y + s2
+            s2 = b2 * x - a2 * y
+            buffer[i] = y if abs(y) >= cutoff else 0.0
+        state[section, 0] = s1 if abs(s1) >= cutoff else 0.0
+        state[section, 1] = s2 if abs(s2) >= cutoff else 0.0
+
+
+def _sosfilt_python(buffer, sos, state, gain, cutoff):
+    for section in range(sos.shape[0]):
+        g = gain if section == 0 else 1.0
+        b0, b1, b2, _a0, a1, a2 = (float(c) for c in sos[section])
+        s1, s2 = float(state[section, 0]), float(state[section, 1])
+        for i, x in enumerate(buffer):
+            x = float(x) * g
+            y = b0 * x + s1
+            s1 = b1 * x - a1 * y + s2
+            s2 = b2 * x - a2 * y
+            buffer[i] = y
+        buffer[np.abs(buffer) < cutoff] = 0.0
+        state[section, 0] = s1 if abs(s1) >= cutoff else 0.0
+        state[section, 1] = s2 if abs(s2) >= cutoff else 0.0
+
+
+def _peak_abs_loop(buffer):
+    peak = 0.0
+    for i in range(buffer.shape[0]):
+        value = abs(buffer[i])
+        if value > peak:
+            peak = value
+    return peak
+
+
+def _peak_abs_numpy(buffer):
+    # max/min instead of np.abs() avoids a temporary array.
+    return max(float(buffer.max()), -float(buffer.min())) if buffer.size else 0.0
+
+
+def _mix_stereo_s16_loop(out, stereo):
+    peak = 0.0
+    for i in range(out.shape[0]):
+        value = np.float32(np.int32(stereo[2 * i]) + np.int32(stereo[2 * i + 1]))
+        out[i] = value
+        if abs(value) > peak:
+            peak = abs(value)
+    return peak
+
+
+def _mix_stereo_s16_numpy(out, stereo):
+    np.add(stereo[0::2], stereo[1::2], out=out, dtype=np.float32)
+    return _peak_abs_numpy(out)
+
+
+def build_wavetables(mults, weights, size):
+    """Return one cycle per row of `weights`, mixing partials `mults` as float32 tables.
+
+    Each row has size + 1 samples; the last repeats the first so interpolation never wraps.
+    """
+    index = np.arange(size + 1)
+    sine = _sine_cycle(size)
+    partials = np.empty((len(mults), size + 1), dtype=np.float64)
+    for row, mult in enumerate(mults):
+        if float(mult).is_integer():
+            # Integer harmonics are exact strided reads of the shared fundamental cycle.
+            partials[row] = sine[(int(mult) * index) % size]
+        else:
+            partials[row] = np.sin(2.0 * np.pi * mult * index / size)
+    return (weights @ partials).astype(np.float32)
+
+
+@lru_cache(maxsize=4)
+def _sine_cycle(size):
+    sine = np.sin(2.0 * np.pi * np.arange(size, dtype=np.float64) / size)
+    sine.flags.writeable = False
+    return sine
+
+
+# For each voice v: out[i] += gains[v] * envelopes[v, i] * lerp(tables[keys[v]], frac(phases[v] + freqs[v] * i * dt))
+render_voices = _njit(
+    _render_voices_loop,
+    "void(float32[:], float32[:, :], float32[:, :], intp[:], float64[:], float64[:], float64[:], float64)",
+) or _render_voices_numpy
+
+# Fills envelopes[row] for voice slots[row] and advances levels/stages in place.
+# Steps are per-sample level deltas; a step of 0 skips that stage instantly.
+render_envelopes = _njit(
+    _render_envelopes_loop,
+    "void(float32[:, :], intp[:], float64[:], int8[:], boolean[:], "
+    "float64, float64, float64, float64, float64, boolean)",
+) or _render_envelopes_numpy
+
+# Cascade of transposed direct form II biquads, in place. `sos` rows are (b0, b1, b2, 1, a1, a2)
+# as in scipy.signal; `state` holds the two delay elements per section and is updated in place.
+# `gain` scales the input as it is read, saving a separate multiply pass over the buffer.
+# The recurrence is serial, so there is no vectorized NumPy fallback.
+sosfilt = _njit(
+    _sosfilt_loop,
+    "void(float32[:], float64[:, :], float64[:, :], float64, float64)",
+) or _sosfilt_python
+
+# Largest absolute sample value, in one pass without temporaries.
+peak_abs = _njit(_peak_abs_loop, "float64(float32[:])") or _peak_abs_numpy
+
+# Sums interleaved int16 stereo into float32 mono `out` (unscaled) and returns its peak,
+# so callers can pick one combined scale without another read of `out`.
+mix_stereo_s16 = _njit(_mix_stereo_s16_loop, "float64(float32[:], int16[:])") or _mix_stereo_s16_numpy
+
+_warmed_up = False
+
+
+def warm_up():
+    """Run each kernel once on dummy input so first use on the audio thread is cheap."""
+    global _warmed_up
+    if _warmed_up:
+        return
+    envelopes = np.zeros((1, 8), dtype=np.float32)
+    slots = np.zeros(1, dtype=np.intp)
+    levels = np.zeros(1, dtype=np.float64)
+    stages = np.zeros(1, dtype=np.int8)
+    released = np.zeros(1, dtype=bool)
+    render_envelopes(envelopes, slots, levels, stages, released, 0.002, 0.0002, 0.5, 0.0001, 0.00001, False)
+    out = np.zeros(8, dtype=np.float32)
+    tables = np.zeros((1, 17), dtype=np.float32)
+    keys = np.zeros(1, dtype=np.intp)
+    scalars = np.ones(1, dtype=np.float64)
+    render_voices(out, envelopes, tables, keys, scalars * 0.5, scalars, scalars, 1.0 / 44100.0)
+    peak_abs(out)
+    mix_stereo_s16(out, np.zeros(16, dtype=np.int16))
+    sosfilt(out, np.array([[0.5, -0.5, 0.0, 1.0, -1.4, 0.45]]), np.zeros((1, 2)), 1.0, 1e-12)
+    _warmed_up = True
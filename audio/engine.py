@@ -1,7 +1,6 @@
 """Audio engine - generates and outputs audio buffers."""
 
-import threading
-import queue
+import gc
 import os
 import time
 import re
@@ -25,6 +24,9 @@ class AudioEngine:
     MASTER_LIMITER_TARGET_PEAK = 0.95
     MASTER_LIMITER_ATTACK = 0.50
     MASTER_LIMITER_RELEASE = 0.04
+    MIX_RING_SIZE = 8
+    # Margin below 1.0 so float32 rounding of the limiter gain cannot slip past the clip check.
+    CLIP_CHECK_PEAK = 0.999
 
     @staticmethod
     def _normalize_device_name(name: str) -> str:
@@ -138,11 +140,15 @@ class AudioEngine:
         self._stream: Optional[sd.OutputStream] = None
         self._running = False
         self._output_device: Optional[int] = None
-        self._synth_lock = threading.Lock()  # Only for synth swapping, not generation
         self._audio_callback_fn: Optional[Callable[[np.ndarray], None]] = None
-        self._mix_queue: queue.SimpleQueue = queue.SimpleQueue()
+        # Single-producer/single-consumer ring: queue_audio() only advances _mix_head,
+        # the audio callback only advances _mix_tail.
+        self._mix_ring: list[Optional[np.ndarray]] = [None] * self.MIX_RING_SIZE
+        self._mix_head = 0
+        self._mix_tail = 0
         self._mix_current: Optional[np.ndarray] = None
         self._mix_index = 0
+        self._mix_scratch = np.zeros(buffer_size, dtype=np.float32)
         self._xrun_count = 0
         self._callback_count = 0
         self._master_gain = 1.0
@@ -175,9 +181,12 @@ class AudioEngine:
         self._volume = max(0.0, min(1.0, value))
 
     def set_synth(self, synth: Synthesizer):
-        """Set the synthesizer to use."""
-        with self._synth_lock:
-            self._synth = synth
+        """Set the synthesizer to use.
+
+        The swap is a single attribute store; the audio callback may still render one
+        more block from the previous synth after this returns.
+        """
+        self._synth = synth
 
     @property
     def output_device(self) -> Optional[int]:
@@ -307,10 +316,45 @@ class AudioEngine:
         self._max_callback_ms = 0.0
 
     def queue_audio(self, samples: np.ndarray):
-        """Queue one-shot audio to mix into output (e.g., metronome click)."""
+        """Queue one-shot audio to mix into output (e.g., metronome click).
+
+        The array is mixed by reference and never modified by the engine;
+        callers must not mutate it after queueing.
+        """
         if samples is None or len(samples) == 0:
             return
-        self._mix_queue.put(np.asarray(samples, dtype=np.float32).copy())
+        head = self._mix_head
+        if head - self._mix_tail >= self.MIX_RING_SIZE:
+            return  # Audio thread is not draining; drop rather than block.
+        self._mix_ring[head % self.MIX_RING_SIZE] = np.asarray(samples, dtype=np.float32)
+        self._mix_head = head + 1
+
+    def _mix_one_shot(self, buffer: np.ndarray, frames: int):
+        """Add the current queued clip into `buffer`, pulling the next one from the ring if idle.
+
+        Clips are shared with the producer by reference and only ever read here; scaling
+        goes through _mix_scratch.
+        """
+        if self._mix_current is None:
+            slot = self._mix_tail % self.MIX_RING_SIZE
+            self._mix_current = self._mix_ring[slot]
+            self._mix_ring[slot] = None
+            self._mix_index = 0
+            self._mix_tail += 1
+
+        remaining = len(self._mix_current) - self._mix_index
+        if remaining <= 0:
+            self._mix_current = None
+            return
+        count = min(frames, remaining)
+        if len(self._mix_scratch) < count:
+            self._mix_scratch = np.zeros(count, dtype=np.float32)
+        scaled = self._mix_scratch[:count]
+        np.multiply(self._mix_current[self._mix_index:self._mix_index + count], self._volume, out=scaled)
+        buffer[:count] += scaled
+        self._mix_index += count
+        if self._mix_index >= len(self._mix_current):
+            self._mix_current = None
 
     def _audio_callback(self, outdata, frames, _time_info, _status):
         """Sounddevice callback - runs in audio thread.
@@ -323,49 +367,35 @@ class AudioEngine:
         if _status:
             self._xrun_count += 1
 
+        # Every stage below works in place on the device buffer.
+        buffer = outdata[:, 0]
         synth = self._synth  # Atomic read
         if synth:
-            buffer = synth.generate(frames)
-            if not isinstance(buffer, np.ndarray):
-                buffer = np.asarray(buffer, dtype=np.float32)
-            if buffer.dtype != np.float32:
-                buffer = buffer.astype(np.float32, copy=False)
-            if len(buffer) != frames:
-                fixed = np.zeros(frames, dtype=np.float32)
-                copy_len = min(frames, len(buffer))
-                if copy_len > 0:
-                    fixed[:copy_len] = buffer[:copy_len]
-                buffer = fixed
+            generate_into = getattr(synth, "generate_into", None)
+            if generate_into is not None:
+                generate_into(buffer)
+            else:
+                rendered = synth.generate(frames)
+                if not isinstance(rendered, np.ndarray):
+                    rendered = np.asarray(rendered, dtype=np.float32)
+                copy_len = min(frames, len(rendered))
+                buffer[:copy_len] = rendered[:copy_len]
+                buffer[copy_len:] = 0.0
             if not np.all(np.isfinite(buffer)):
                 self._non_finite_blocks += 1
-                buffer = np.nan_to_num(buffer, copy=False, nan=0.0, posinf=1.0, neginf=-1.0)
-            np.multiply(buffer, self._volume, out=buffer, casting="unsafe")
+                np.nan_to_num(buffer, copy=False, nan=0.0, posinf=1.0, neginf=-1.0)
+            buffer *= self._volume
         else:
-            buffer = np.zeros(frames, dtype=np.float32)
+            buffer.fill(0.0)
 
-        # Mix any queued one-shot audio (e.g., metronome click).
-        if self._mix_current is None:
-            try:
-                self._mix_current = self._mix_queue.get_nowait()
-                self._mix_index = 0
-            except queue.Empty:
-                self._mix_current = None
-
-        if self._mix_current is not None:
-            remaining = len(self._mix_current) - self._mix_index
-            if remaining <= 0:
-                self._mix_current = None
-            else:
-                count = min(frames, remaining)
-                buffer[:count] += (
-                    self._mix_current[self._mix_index:self._mix_index + count] * self._volume
-                )
-                self._mix_index += count
-                if self._mix_index >= len(self._mix_current):
-                    self._mix_current = None
+        # Mix any queued one-shot audio (e.g., metronome click). Most callbacks have
+        # nothing queued, so the common case is this one check.
+        if self._mix_current is not None or self._mix_tail != self._mix_head:
+            self._mix_one_shot(buffer, frames)
 
         # Smooth master limiting to avoid hard clipping crackle at high loudness/polyphony.
-        peak = float(np.max(np.abs(buffer)))
+        # max/min instead of np.abs() avoids a temporary array.
+        peak = max(float(buffer.max()), -float(buffer.min()))
         self._last_peak = peak
         self._peak_hold = max(peak, self._peak_hold * 0.965)
         if peak > 1e-9:
@@ -376,15 +406,14 @@ class AudioEngine:
                 coeff = self.MASTER_LIMITER_RELEASE
             self._master_gain += (needed - self._master_gain) * coeff
             buffer *= self._master_gain
+            peak *= self._master_gain
         else:
             self._master_gain = min(1.0, self._master_gain + self.MASTER_LIMITER_RELEASE)
 
-        over = np.abs(buffer) > 1.0
-        if np.any(over):
-            self._clip_samples += int(np.count_nonzero(over))
-        # Final guardrail clip.
-        np.clip(buffer, -1.0, 1.0, out=buffer)
-        outdata[:, 0] = buffer
+        # Final guardrail clip, only when the limited peak can actually exceed full scale.
+        if peak > self.CLIP_CHECK_PEAK:
+            self._clip_samples += int(np.count_nonzero(np.abs(buffer) > 1.0))
+            np.clip(buffer, -1.0, 1.0, out=buffer)
 
         # Notify callback (for recording)
         if self._audio_callback_fn:
@@ -422,9 +451,29 @@ class AudioEngine:
             self._stream.close()
             self._stream = None
 
+    def warm_up(self):
+        """Render and discard one buffer so lazy NumPy/JIT setup happens before playback."""
+        self.generate_buffer()
+
+    @staticmethod
+    def post_init_freeze():
+        """Move everything allocated during startup out of the garbage collector's scans.
+
+        Long-lived Qt/audio objects otherwise get re-walked on every collection, and a
+        collection triggered by an allocation on the audio thread can cause an underrun.
+        """
+        gc.collect()
+        gc.freeze()
+
     def generate_buffer(self) -> np.ndarray:
         """Generate next audio buffer. For testing without output."""
+        buffer = np.zeros(self.buffer_size, dtype=np.float32)
         synth = self._synth
         if synth:
-            return synth.generate(self.buffer_size) * self._volume
-        return np.zeros(self.buffer_size, dtype=np.float32)
+            generate_into = getattr(synth, "generate_into", None)
+            if generate_into is not None:
+                generate_into(buffer)
+            else:
+                buffer[:] = synth.generate(self.buffer_size)
+            buffer *= self._volume
+        return buffer
@@ -2,9 +2,30 @@
 
 import numpy as np
 import time
+from functools import lru_cache
 from PyQt6.QtCore import QTimer, QObject, pyqtSignal, Qt
 
 
+@lru_cache(maxsize=16)
+def _make_click(sample_rate: int, accent: bool, volume: float) -> np.ndarray:
+    """Generate a short click sound, shared between Metronome instances."""
+    duration = 0.034 if accent else 0.024
+    samples = int(sample_rate * duration)
+    t = np.linspace(0, duration, samples, dtype=np.float32)
+
+    freq = 1080 if accent else 760  # Hz
+    envelope = np.exp(-t * (38.0 if accent else 34.0))
+    amplitude = (0.55 if accent else 0.32) * volume
+    fundamental = np.sin(2 * np.pi * freq * t)
+    overtone = np.sin(2 * np.pi * (freq * 2.0) * t) * 0.20
+    click = (fundamental + overtone) * envelope * amplitude
+
+    # Cached and shared by reference with the audio engine on every beat, so keep it immutable.
+    click = click.astype(np.float32)
+    click.flags.writeable = False
+    return click
+
+
 class Metronome(QObject):
     """Generates metronome click at specified BPM."""
 
@@ -31,23 +52,8 @@ class Metronome(QObject):
         self._timer.timeout.connect(self._on_beat)
 
         # Generate click sounds.
-        self._click_samples = self._generate_click(accent=False)
-        self._accent_click_samples = self._generate_click(accent=True)
-
-    def _generate_click(self, accent: bool) -> np.ndarray:
-        """Generate a short click sound."""
-        duration = 0.034 if accent else 0.024
-        samples = int(self.sample_rate * duration)
-        t = np.linspace(0, duration, samples, dtype=np.float32)
-
-        freq = 1080 if accent else 760  # Hz
-        envelope = np.exp(-t * (38.0 if accent else 34.0))
-        amplitude = (0.55 if accent else 0.32) * self._volume
-        fundamental = np.sin(2 * np.pi * freq * t)
-        overtone = np.sin(2 * np.pi * (freq * 2.0) * t) * 0.20
-        click = (fundamental + overtone) * envelope * amplitude
-
-        return click.astype(np.float32)
+        self._click_samples = _make_click(self.sample_rate, False, self._volume)
+        self._accent_click_samples = _make_click(self.sample_rate, True, self._volume)
 
     @property
     def bpm(self) -> int:
@@ -69,11 +75,11 @@ class Metronome(QObject):
     @volume.setter
     def volume(self, value: float):
         self._volume = max(0.0, min(1.0, float(value)))
-        self._click_samples = self._generate_click(accent=False)
-        self._accent_click_samples = self._generate_click(accent=True)
+        self._click_samples = _make_click(self.sample_rate, False, self._volume)
+        self._accent_click_samples = _make_click(self.sample_rate, True, self._volume)
 
     def set_click_callback(self, callback):
-        """Set callback to play click sound. Callback receives numpy array."""
+        """Set callback to play click sound. Callback receives a read-only numpy array."""
         self._click_callback = callback
 
     def set_meter(self, beats_per_cycle: int, accent_beat: int | None = None):
@@ -114,7 +120,7 @@ class Metronome(QObject):
             self._beat_index = (self._beat_index % self._beats_per_cycle) + 1
             is_accent = self._beat_index == self._accent_beat
             samples = self._accent_click_samples if is_accent else self._click_samples
-            self._click_callback(samples.copy())
+            self._click_callback(samples)
 
         now = time.perf_counter()
         if self._next_beat_at is None:
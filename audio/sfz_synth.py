@@ -6,7 +6,6 @@ import ctypes
 import ctypes.util
 import os
 import queue
-import threading
 from pathlib import Path
 
 import numpy as np
@@ -109,8 +108,8 @@ class SfizzSynth:
         self.sample_rate = int(sample_rate)
         self._instrument = "Piano"
         self._output_gain = 1.0
-        self._notes: set[int] = set()
-        self._notes_lock = threading.Lock()
+        self._notes: set[int] = set()  # Owned by the audio thread
+        self._active_note_count = 0  # Published for the UI
         self._event_queue: queue.SimpleQueue = queue.SimpleQueue()
 
         self._synth = self._lib.sfizz_create_synth()
@@ -176,16 +175,15 @@ class SfizzSynth:
                 break
             if event_type == "note_on":
                 self._lib.sfizz_send_note_on(self._synth, 0, int(a), int(b))
-                with self._notes_lock:
-                    self._notes.add(int(a))
+                self._notes.add(int(a))
                 continue
             if event_type == "note_off":
                 self._lib.sfizz_send_note_off(self._synth, 0, int(a), 64)
-                with self._notes_lock:
-                    self._notes.discard(int(a))
+                self._notes.discard(int(a))
                 continue
             if event_type == "sustain":
                 self._lib.sfizz_send_cc(self._synth, 0, 64, 127 if int(a) else 0)
+        self._active_note_count = len(self._notes)
 
     def generate(self, num_samples: int) -> np.ndarray:
         frames = max(1, int(num_samples))
@@ -209,9 +207,7 @@ class SfizzSynth:
         return mono
 
     def active_notes_count(self) -> int:
-        self._drain_event_queue()
-        with self._notes_lock:
-            return len(self._notes)
+        return self._active_note_count
 
     def cleanup(self):
         synth = self._synth
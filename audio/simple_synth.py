@@ -1,23 +1,17 @@
 """Simple additive synthesizer with switchable instrument profiles."""
 
 import threading
-import queue
 import numpy as np
-from dataclasses import dataclass
-from typing import Dict
 
+from audio import dsp
+from audio.dsp import STAGE_ATTACK, STAGE_DECAY, STAGE_OFF, STAGE_PEDAL, STAGE_RELEASE
 from piano_player.instruments import DEFAULT_INSTRUMENT as DEFAULT_INSTRUMENT_KEY, normalize_instrument
 
 
-@dataclass
-class Note:
-    """Active note state."""
-    frequency: float
-    velocity: float
-    phase: float = 0.0
-    envelope: float = 0.0
-    stage: str = "attack"  # attack, decay, sustain, pedal, release, off
-    released: bool = False
+# Event codes posted to the audio thread.
+EVENT_NOTE_ON = 0
+EVENT_NOTE_OFF = 1
+EVENT_SUSTAIN = 2
 
 
 class SimpleSynth:
@@ -72,18 +66,41 @@ class SimpleSynth:
     MIX_GAIN_ATTACK = 0.26
     MIX_GAIN_RELEASE = 0.06
     MAX_VOICES = 88
+    VOICE_SLOTS = 128  # one per MIDI note; MAX_VOICES is the soft cap enforced by stealing
+    WAVETABLE_SIZE = 4096
     DENORMAL_CUTOFF = 1e-12
+    SILENT_VOICE_LEVEL = 1e-4  # envelope * velocity below which a releasing voice is dropped
     SATURATION_DRIVE = 1.0
+    EVENT_RING_SIZE = 1024  # power of two
 
     def __init__(self, sample_rate: int = 44100, instrument: str = DEFAULT_INSTRUMENT):
+        dsp.warm_up()
         self.sample_rate = sample_rate
-        self._notes: Dict[int, Note] = {}
+        # Voice state is stored as parallel arrays indexed by slot; slot == MIDI note number.
+        self._voice_active = np.zeros(self.VOICE_SLOTS, dtype=bool)
+        self._voice_freq = 440.0 * (2.0 ** ((np.arange(self.VOICE_SLOTS) - 69) / 12.0))
+        self._voice_velocity = np.zeros(self.VOICE_SLOTS, dtype=np.float64)
+        self._voice_phase = np.zeros(self.VOICE_SLOTS, dtype=np.float64)  # cycles, 0..1
+        self._voice_env = np.zeros(self.VOICE_SLOTS, dtype=np.float64)
+        self._voice_stage = np.full(self.VOICE_SLOTS, STAGE_OFF, dtype=np.int8)
+        self._voice_released = np.zeros(self.VOICE_SLOTS, dtype=bool)
+        self._voice_count = 0
         self._sustain = False
-        self._sustained_notes: set = set()
-        self._lock = threading.Lock()
-        self._event_queue = queue.SimpleQueue()
-        self._cached_offsets = np.zeros(0, dtype=np.float32)
-        self._cached_offsets_n = 0
+        # All voice/DSP state is owned by the audio thread; other threads only post events.
+        # Events go through a fixed ring: producers (MIDI thread, GUI) serialize on
+        # _producer_lock and advance _event_head; only the audio thread advances _event_tail.
+        self._event_ring: list = [None] * self.EVENT_RING_SIZE
+        self._event_head = 0
+        self._event_tail = 0
+        self._producer_lock = threading.Lock()
+        # Instrument changes are published as (serial, profile, wavetables) and picked up by serial.
+        self._pending_profile = None
+        self._applied_profile_serial = 0
+        self._active_voice_count = 0
+        # Scratch buffers reused across callbacks; grown on demand.
+        self._mix_buffer = np.zeros(0, dtype=np.float32)
+        self._envelope_buffer = np.zeros((self.VOICE_SLOTS, 0), dtype=np.float32)
+        self._saturation_buffer = np.zeros((2, 0), dtype=np.float32)
         self._limiter_gain = 1.0
         self._mix_gain = 1.0
         self._instrument = self.DEFAULT_INSTRUMENT
@@ -92,182 +109,233 @@ class SimpleSynth:
         self._sustain_level = 0.4
         self._release = 0.3
         self._pedal_release = 2.0
+        self._attack_step = 0.0
+        self._decay_step = 0.0
+        self._release_step = 0.0
+        self._pedal_step = 0.0
         self._gain = 0.26
         self._harmonics = [(1.0, 1.0)]
         self._poly_comp = self.POLYPHONY_COMPENSATION
         self._low_balance_hz = 180.0
         self._low_min_gain = 0.6
+        self._key_gain = np.zeros(self.VOICE_SLOTS, dtype=np.float64)
         self._hp_hz = 30.0
         self._lp_hz = 7000.0
-        self._hp_alpha = 0.0
-        self._lp_alpha = 0.0
-        self._hp_prev_x = 0.0
-        self._hp_prev_y = 0.0
-        self._lp_prev_y = 0.0
+        self._filter_sos = np.zeros((1, 6), dtype=np.float64)  # (b0, b1, b2, 1, a1, a2) per section
+        self._filter_state = np.zeros((1, 2), dtype=np.float64)
+        self._wavetables = np.zeros((128, self.WAVETABLE_SIZE + 1), dtype=np.float32)
         self.set_instrument(instrument)
 
     def set_instrument(self, instrument: str):
-        with self._lock:
-            selected = normalize_instrument(instrument)
-            profile = self.INSTRUMENTS.get(selected, self.INSTRUMENTS[self.DEFAULT_INSTRUMENT])
-            self._instrument = selected
-            self._attack = float(profile["attack"])
-            self._decay = float(profile["decay"])
-            self._sustain_level = float(profile["sustain_level"])
-            self._release = float(profile["release"])
-            self._pedal_release = float(profile["pedal_release"])
-            self._gain = float(profile["gain"])
-            self._harmonics = list(profile["harmonics"])
-            self._poly_comp = float(profile.get("poly_comp", self.POLYPHONY_COMPENSATION))
-            self._low_balance_hz = float(profile.get("low_balance_hz", 180.0))
-            self._low_min_gain = float(profile.get("low_min_gain", 0.6))
-            self._hp_hz = float(profile.get("hp_hz", 30.0))
-            self._lp_hz = float(profile.get("lp_hz", 7000.0))
-            self._recompute_filter_coeffs()
-            self._hp_prev_x = 0.0
-            self._hp_prev_y = 0.0
-            self._lp_prev_y = 0.0
+        """Switch instrument profile; applied by the audio thread on the next buffer."""
+        selected = normalize_instrument(instrument)
+        profile = self.INSTRUMENTS.get(selected, self.INSTRUMENTS[self.DEFAULT_INSTRUMENT])
+        self._instrument = selected
+        # Bake wavetables here so the audio thread only has to swap them in.
+        wavetables = self._build_wavetables(list(profile["harmonics"]))
+        with self._producer_lock:
+            serial = self._pending_profile[0] + 1 if self._pending_profile else 1
+            self._pending_profile = (serial, profile, wavetables)
+
+    def _apply_profile(self, profile: dict, wavetables: np.ndarray):
+        self._attack = float(profile["attack"])
+        self._decay = float(profile["decay"])
+        self._sustain_level = float(profile["sustain_level"])
+        self._release = float(profile["release"])
+        self._pedal_release = float(profile["pedal_release"])
+        self._gain = float(profile["gain"])
+        self._harmonics = list(profile["harmonics"])
+        self._poly_comp = float(profile.get("poly_comp", self.POLYPHONY_COMPENSATION))
+        self._low_balance_hz = float(profile.get("low_balance_hz", 180.0))
+        self._low_min_gain = float(profile.get("low_min_gain", 0.6))
+        # Per-key output gain with low-note balancing, so rendering only multiplies by velocity.
+        self._key_gain = self._gain * np.clip(self._voice_freq / self._low_balance_hz, self._low_min_gain, 1.0)
+        self._hp_hz = float(profile.get("hp_hz", 30.0))
+        self._lp_hz = float(profile.get("lp_hz", 7000.0))
+        self._recompute_filter_coeffs()
+        self._recompute_envelope_steps()
+        self._wavetables = wavetables
+        self._filter_state.fill(0.0)
 
     @property
     def instrument(self) -> str:
         return self._instrument
 
+    def _recompute_envelope_steps(self):
+        """Convert ADSR times to per-sample level deltas; 0 marks an instant stage."""
+        dt = 1.0 / self.sample_rate
+        self._attack_step = dt / self._attack if self._attack > 0 else 0.0
+        self._decay_step = dt * (1.0 - self._sustain_level) / self._decay if self._decay > 0 else 0.0
+        self._release_step = dt / self._release if self._release > 0 else 0.0
+        self._pedal_step = dt / self._pedal_release if self._pedal_release > 0 else 0.0
+
     def _recompute_filter_coeffs(self):
         dt = 1.0 / self.sample_rate
         hp_rc = 1.0 / (2.0 * np.pi * max(1.0, self._hp_hz))
         lp_rc = 1.0 / (2.0 * np.pi * max(1.0, self._lp_hz))
-        self._hp_alpha = hp_rc / (hp_rc + dt)
-        self._lp_alpha = dt / (lp_rc + dt)
+        hp_alpha = hp_rc / (hp_rc + dt)
+        lp_alpha = dt / (lp_rc + dt)
+        # One-pole HP  alpha * (1 - z^-1) / (1 - alpha * z^-1) cascaded with
+        # one-pole LP  beta / (1 - (1 - beta) * z^-1), folded into a single biquad.
+        lp_pole = 1.0 - lp_alpha
+        gain = hp_alpha * lp_alpha
+        self._filter_sos = np.array(
+            [[gain, -gain, 0.0, 1.0, -(hp_alpha + lp_pole), hp_alpha * lp_pole]], dtype=np.float64
+        )
+        self._filter_state = np.zeros((len(self._filter_sos), 2), dtype=np.float64)
 
     def note_on(self, note_number: int, velocity: int):
         """Start playing a note."""
-        self._event_queue.put(("note_on", int(note_number), int(velocity)))
+        self._post_event(EVENT_NOTE_ON, int(note_number), int(velocity))
 
     def note_off(self, note_number: int):
         """Release a note (or hold if sustain is on)."""
-        self._event_queue.put(("note_off", int(note_number), 0))
+        self._post_event(EVENT_NOTE_OFF, int(note_number), 0)
 
     def sustain_on(self):
         """Enable sustain pedal."""
-        self._event_queue.put(("sustain", 1, 0))
+        self._post_event(EVENT_SUSTAIN, 1, 0)
 
     def sustain_off(self):
         """Disable sustain pedal and release held notes."""
-        self._event_queue.put(("sustain", 0, 0))
+        self._post_event(EVENT_SUSTAIN, 0, 0)
 
     def generate(self, num_samples: int) -> np.ndarray:
-        """Generate audio samples."""
-        with self._lock:
-            self._drain_event_queue_locked()
-            buffer = np.zeros(num_samples, dtype=np.float32)
-            notes_to_remove = []
-            offsets = self._time_offsets(num_samples)
-
-            for note_num, note in self._notes.items():
-                note_buffer = self._generate_note(note, offsets)
-                buffer += note_buffer
-
-                if note.stage == "off":
-                    notes_to_remove.append(note_num)
-
-            for note_num in notes_to_remove:
-                del self._notes[note_num]
-
-            active_count = len(self._notes)
-            if active_count > 1:
-                # Real acoustic instruments do not sum linearly forever in perceived loudness.
-                # Apply light polyphony compensation before limiting.
-                target_mix = 1.0 / (1.0 + self._poly_comp * (active_count - 1))
-            else:
-                target_mix = 1.0
-            self._mix_gain = self._smooth_gain(
-                current=self._mix_gain,
-                target=target_mix,
-                attack=self.MIX_GAIN_ATTACK,
-                release=self.MIX_GAIN_RELEASE,
+        """Generate audio samples.
+
+        The returned array is an internal scratch buffer that is overwritten by
+        the next call; callers that keep samples around must copy them.
+        """
+        if num_samples > len(self._mix_buffer):
+            self._mix_buffer = np.zeros(num_samples, dtype=np.float32)
+        buffer = self._mix_buffer[:num_samples]
+        self.generate_into(buffer)
+        return buffer
+
+    def generate_into(self, out: np.ndarray):
+        """Render the next len(out) samples directly into the float32 array `out`."""
+        num_samples = len(out)
+        self._drain_events()
+        out.fill(0.0)
+
+        slots = np.flatnonzero(self._voice_active)
+        if slots.size:
+            slots = self._cull_silent_voices(slots)
+        if slots.size:
+            if num_samples > self._envelope_buffer.shape[1]:
+                self._envelope_buffer = np.zeros((self.VOICE_SLOTS, num_samples), dtype=np.float32)
+            envelopes = self._envelope_buffer[:slots.size, :num_samples]
+            dsp.render_envelopes(
+                envelopes,
+                slots,
+                self._voice_env,
+                self._voice_stage,
+                self._voice_released,
+                self._attack_step,
+                self._decay_step,
+                self._sustain_level,
+                self._release_step,
+                self._pedal_step,
+                self._sustain,
             )
-            buffer *= self._mix_gain
-
-            buffer = self._apply_limiter(buffer)
-            buffer = self._apply_output_filter(buffer)
-            buffer = self._apply_saturation(buffer)
-            return buffer
-
-    def _time_offsets(self, num_samples: int) -> np.ndarray:
-        if num_samples != self._cached_offsets_n:
-            self._cached_offsets = (np.arange(num_samples, dtype=np.float32) / self.sample_rate)
-            self._cached_offsets_n = num_samples
-        return self._cached_offsets
-
-    def _drain_event_queue_locked(self):
-        while True:
-            try:
-                event_type, a, b = self._event_queue.get_nowait()
-            except queue.Empty:
-                break
-
-            if event_type == "note_on":
-                note_number = int(a)
+            self._render_voices(slots, envelopes, out)
+
+            finished = self._voice_stage[slots] == STAGE_OFF
+            if finished.any():
+                self._free_voices(slots[finished])
+
+        active_count = self._voice_count
+        self._active_voice_count = active_count
+        if active_count > 1:
+            # Real acoustic instruments do not sum linearly forever in perceived loudness.
+            # Apply light polyphony compensation before limiting.
+            target_mix = 1.0 / (1.0 + self._poly_comp * (active_count - 1))
+        else:
+            target_mix = 1.0
+        self._mix_gain = self._smooth_gain(
+            current=self._mix_gain,
+            target=target_mix,
+            attack=self.MIX_GAIN_ATTACK,
+            release=self.MIX_GAIN_RELEASE,
+        )
+        gain = self._update_limiter(out, self._mix_gain)
+        self._apply_output_filter(out, gain)
+        self._apply_saturation(out)
+
+    def _post_event(self, event_type: int, a: int, b: int):
+        with self._producer_lock:
+            head = self._event_head
+            if head - self._event_tail >= self.EVENT_RING_SIZE:
+                return  # Audio thread is not draining; drop rather than block.
+            self._event_ring[head & (self.EVENT_RING_SIZE - 1)] = (event_type, a, b)
+            self._event_head = head + 1
+
+    def _drain_events(self):
+        pending = self._pending_profile
+        if pending is not None and pending[0] != self._applied_profile_serial:
+            self._applied_profile_serial = pending[0]
+            self._apply_profile(pending[1], pending[2])
+
+        ring = self._event_ring
+        mask = self.EVENT_RING_SIZE - 1
+        tail = self._event_tail
+        head = self._event_head
+        while tail != head:
+            event_type, a, b = ring[tail & mask]
+            tail += 1
+
+            if event_type == EVENT_NOTE_ON:
+                slot = max(0, min(127, int(a)))
                 velocity_norm = max(1, min(127, int(b))) / 127.0
-                frequency = 440.0 * (2.0 ** ((note_number - 69) / 12.0))
-                existing = self._notes.get(note_number)
-                if existing is not None:
+                if self._voice_active[slot]:
                     # Retrigger in-place to avoid hard discontinuities when repeating same note.
-                    existing.velocity = velocity_norm
-                    existing.released = False
-                    if existing.envelope < 1.0:
-                        existing.stage = "attack"
+                    self._voice_velocity[slot] = velocity_norm
+                    self._voice_released[slot] = False
+                    if self._voice_env[slot] < 1.0:
+                        self._voice_stage[slot] = STAGE_ATTACK
                     else:
-                        existing.stage = "decay"
-                    self._sustained_notes.discard(note_number)
+                        self._voice_stage[slot] = STAGE_DECAY
                     continue
 
-                if len(self._notes) >= self.MAX_VOICES:
+                if self._voice_count >= self.MAX_VOICES:
                     self._steal_voice()
-                self._notes[note_number] = Note(
-                    frequency=frequency,
-                    velocity=velocity_norm,
-                    # Start at a zero crossing to prevent onset clicks.
-                    phase=0.0,
-                    envelope=0.0,
-                    stage="attack",
-                    released=False,
-                )
+                self._voice_active[slot] = True
+                self._voice_count += 1
+                self._voice_velocity[slot] = velocity_norm
+                # Start at a zero crossing to prevent onset clicks.
+                self._voice_phase[slot] = 0.0
+                self._voice_env[slot] = 0.0
+                self._voice_stage[slot] = STAGE_ATTACK
+                self._voice_released[slot] = False
                 continue
 
-            if event_type == "note_off":
-                note_number = int(a)
-                if note_number in self._notes:
-                    note = self._notes[note_number]
-                    note.released = True
+            if event_type == EVENT_NOTE_OFF:
+                slot = max(0, min(127, int(a)))
+                if self._voice_active[slot]:
+                    self._voice_released[slot] = True
                     if self._sustain:
-                        self._sustained_notes.add(note_number)
-                        note.stage = "pedal"
+                        self._voice_stage[slot] = STAGE_PEDAL
                     else:
-                        note.stage = "release"
+                        self._voice_stage[slot] = STAGE_RELEASE
                 continue
 
-            if event_type == "sustain":
+            if event_type == EVENT_SUSTAIN:
                 self._sustain = bool(a)
                 if not self._sustain:
-                    for note_num in self._sustained_notes:
-                        if note_num in self._notes:
-                            self._notes[note_num].released = True
-                            self._notes[note_num].stage = "release"
-                    self._sustained_notes.clear()
+                    # Pedal-held voices are exactly those in the pedal stage; a note-on moves
+                    # its slot out of it, so the stage array doubles as the held-note bitmap.
+                    self._voice_stage[self._voice_stage == STAGE_PEDAL] = STAGE_RELEASE
+        self._event_tail = tail
 
     def _steal_voice(self):
-        if not self._notes:
+        if not self._voice_count:
             return
-        victim_key, victim_note = min(
-            self._notes.items(),
-            key=lambda kv: kv[1].envelope * kv[1].velocity,
-        )
+        loudness = np.where(self._voice_active, self._voice_env * self._voice_velocity, np.inf)
+        victim = int(np.argmin(loudness))
         # Avoid abrupt removals that can click/crackle.
-        victim_note.released = True
-        victim_note.stage = "release"
-        victim_note.envelope = min(victim_note.envelope, 0.05)
-        self._sustained_notes.discard(victim_key)
+        self._voice_released[victim] = True
+        self._voice_stage[victim] = STAGE_RELEASE
+        self._voice_env[victim] = min(self._voice_env[victim], 0.05)
 
     @staticmethod
     def _smooth_gain(current: float, target: float, attack: float, release: float) -> float:
@@ -280,45 +348,57 @@ class SimpleSynth:
         return current + (target - current) * coeff
 
     def active_notes_count(self) -> int:
-        """Return number of currently active notes."""
-        with self._lock:
-            self._drain_event_queue_locked()
-            return len(self._notes)
-
-    def _generate_note(self, note: Note, offsets: np.ndarray) -> np.ndarray:
-        """Generate samples for a single note with vectorized oscillators."""
-        num_samples = int(len(offsets))
-        envelope = self._build_envelope_block(note, num_samples)
-        if note.stage == "off" and not np.any(envelope):
-            return np.zeros(num_samples, dtype=np.float32)
-
-        t = note.phase + offsets
-        waveform = np.zeros(num_samples, dtype=np.float32)
+        """Return number of active notes as of the last generated buffer."""
+        return self._active_voice_count
+
+    def _build_wavetables(self, harmonics: list) -> np.ndarray:
+        """Bake the single-cycle harmonic mix for every MIDI note."""
+        frequencies = self._voice_freq
+        mults = np.array([mult for mult, _amp in harmonics], dtype=np.float64)
+        amps = np.array([amp for _mult, amp in harmonics], dtype=np.float64)
         # Darken lower notes to avoid buzzy bass buildup under sustain.
-        brightness = float(np.clip(note.frequency / 1000.0, 0.30, 1.0))
-        low_weight = float(np.clip(note.frequency / self._low_balance_hz, self._low_min_gain, 1.0))
-        nyquist = 0.48 * float(self.sample_rate)
-        for harmonic_mult, harmonic_amp in self._harmonics:
-            freq = note.frequency * harmonic_mult
-            # Band-limit additive partials to avoid high-note aliasing crackle.
-            if freq >= nyquist:
-                continue
-            harmonic_tilt = brightness ** max(0.0, harmonic_mult - 1.0)
-            waveform += (harmonic_amp * harmonic_tilt) * np.sin(2.0 * np.pi * freq * t)
-
-        # Keep phase bounded for long sessions to preserve numeric precision.
-        note.phase += num_samples / self.sample_rate
-        period = 1.0 / max(1e-9, note.frequency)
-        if note.phase >= period:
-            note.phase %= period
-        return (waveform * envelope * note.velocity * self._gain * low_weight).astype(np.float32)
-
-    def _apply_limiter(self, buffer: np.ndarray) -> np.ndarray:
-        """Apply a lightweight peak limiter to avoid sustain-pedal overload artifacts."""
-        peak = float(np.max(np.abs(buffer)))
+        brightness = np.clip(frequencies / 1000.0, 0.30, 1.0)
+        weights = amps[None, :] * brightness[:, None] ** np.maximum(0.0, mults - 1.0)[None, :]
+        # Band-limit additive partials to avoid high-note aliasing crackle.
+        weights[frequencies[:, None] * mults[None, :] >= 0.48 * float(self.sample_rate)] = 0.0
+        return dsp.build_wavetables(mults, weights, self.WAVETABLE_SIZE)
+
+    def _cull_silent_voices(self, slots: np.ndarray) -> np.ndarray:
+        """Free releasing voices that have decayed below audibility; return the rest."""
+        stages = self._voice_stage[slots]
+        releasing = (stages == STAGE_PEDAL) | (stages == STAGE_RELEASE)
+        silent = releasing & (self._voice_env[slots] * self._voice_velocity[slots] < self.SILENT_VOICE_LEVEL)
+        if not silent.any():
+            return slots
+        self._free_voices(slots[silent])
+        return slots[~silent]
+
+    def _free_voices(self, slots: np.ndarray):
+        self._voice_active[slots] = False
+        self._voice_stage[slots] = STAGE_OFF
+        self._voice_count -= len(slots)
+
+    def _render_voices(self, slots: np.ndarray, envelopes: np.ndarray, out: np.ndarray):
+        """Render the given voice slots and accumulate them into `out`."""
+        freqs = self._voice_freq[slots]
+        phases = self._voice_phase[slots]
+        gains = self._voice_velocity[slots] * self._key_gain[slots]
+        dt = 1.0 / self.sample_rate
+        dsp.render_voices(out, envelopes, self._wavetables, slots, phases, freqs, gains, dt)
+
+        # Phase is kept in cycles; wrapping preserves precision over long sessions.
+        self._voice_phase[slots] = (phases + freqs * (len(out) * dt)) % 1.0
+
+    def _update_limiter(self, buffer: np.ndarray, pre_gain: float = 1.0) -> float:
+        """Run a lightweight peak limiter to avoid sustain-pedal overload artifacts.
+
+        Returns the total gain (`pre_gain` times limiter gain) for `buffer`; the caller
+        applies it, so the buffer is only read here.
+        """
+        peak = dsp.peak_abs(buffer) * pre_gain
         if peak <= 1e-9:
             self._limiter_gain = min(1.0, self._limiter_gain + self.LIMITER_RELEASE)
-            return buffer
+            return pre_gain
 
         needed_gain = min(1.0, self.LIMITER_TARGET_PEAK / peak)
         self._limiter_gain = self._smooth_gain(
@@ -327,135 +407,31 @@ class SimpleSynth:
             attack=self.LIMITER_ATTACK,
             release=self.LIMITER_RELEASE,
         )
+        return pre_gain * self._limiter_gain
 
-        return buffer * self._limiter_gain
-
-    def _apply_output_filter(self, buffer: np.ndarray) -> np.ndarray:
-        """Apply gentle high-pass/low-pass filtering to reduce rumble and harshness."""
-        out = np.empty_like(buffer)
-        hp_alpha = self._hp_alpha
-        lp_alpha = self._lp_alpha
-        prev_x = self._hp_prev_x
-        prev_hp = self._hp_prev_y
-        prev_lp = self._lp_prev_y
-
-        for i, x in enumerate(buffer):
-            hp = hp_alpha * (prev_hp + float(x) - prev_x)
-            lp = prev_lp + lp_alpha * (hp - prev_lp)
-            out[i] = lp
-            prev_x = float(x)
-            prev_hp = hp
-            prev_lp = lp
-
-        cutoff = self.DENORMAL_CUTOFF
-        if abs(prev_x) < cutoff:
-            prev_x = 0.0
-        if abs(prev_hp) < cutoff:
-            prev_hp = 0.0
-        if abs(prev_lp) < cutoff:
-            prev_lp = 0.0
-
-        self._hp_prev_x = prev_x
-        self._hp_prev_y = prev_hp
-        self._lp_prev_y = prev_lp
-        out[np.abs(out) < cutoff] = 0.0
-        return out
+    def _apply_output_filter(self, buffer: np.ndarray, gain: float = 1.0) -> np.ndarray:
+        """Scale by `gain` and apply gentle high-pass/low-pass filtering in place, in one pass."""
+        dsp.sosfilt(buffer, self._filter_sos, self._filter_state, gain, self.DENORMAL_CUTOFF)
+        return buffer
 
     def _apply_saturation(self, buffer: np.ndarray) -> np.ndarray:
         """Apply subtle soft clipping to suppress hard digital clipping transients."""
         drive = float(self.SATURATION_DRIVE)
         if drive <= 1.0:
             return buffer
-        return np.tanh(buffer * drive).astype(np.float32) / drive
-
-    def _build_envelope_block(self, note: Note, num_samples: int) -> np.ndarray:
-        """Generate ADSR envelope values for this buffer and update note state."""
-        envelope = np.zeros(num_samples, dtype=np.float32)
-        dt = 1.0 / self.sample_rate
-        i = 0
-
-        while i < num_samples:
-            if note.stage == "attack":
-                if self._attack <= 0:
-                    note.envelope = 1.0
-                    note.stage = "decay"
-                    continue
-                step = dt / self._attack
-                remaining = max(1, int(np.ceil((1.0 - note.envelope) / step)))
-                block = min(num_samples - i, remaining)
-                vals = note.envelope + step * np.arange(1, block + 1, dtype=np.float32)
-                vals = np.minimum(vals, 1.0)
-                envelope[i:i + block] = vals
-                note.envelope = float(vals[-1])
-                i += block
-                if note.envelope >= 1.0:
-                    note.envelope = 1.0
-                    note.stage = "decay"
-                continue
-
-            if note.stage == "decay":
-                if self._decay <= 0:
-                    note.envelope = self._sustain_level
-                    note.stage = "sustain"
-                    continue
-                step = dt * (1.0 - self._sustain_level) / self._decay
-                remaining = max(1, int(np.ceil((note.envelope - self._sustain_level) / step)))
-                block = min(num_samples - i, remaining)
-                vals = note.envelope - step * np.arange(1, block + 1, dtype=np.float32)
-                vals = np.maximum(vals, self._sustain_level)
-                envelope[i:i + block] = vals
-                note.envelope = float(vals[-1])
-                i += block
-                if note.envelope <= self._sustain_level:
-                    note.envelope = self._sustain_level
-                    note.stage = "sustain"
-                continue
-
-            if note.stage == "sustain":
-                if note.released:
-                    note.stage = "pedal" if self._sustain else "release"
-                    continue
-                envelope[i:] = note.envelope
-                i = num_samples
-                continue
-
-            if note.stage == "pedal":
-                if self._pedal_release <= 0:
-                    note.envelope = 0.0
-                    note.stage = "off"
-                    continue
-                step = dt / self._pedal_release
-                remaining = max(1, int(np.ceil(note.envelope / step)))
-                block = min(num_samples - i, remaining)
-                vals = note.envelope - step * np.arange(1, block + 1, dtype=np.float32)
-                vals = np.maximum(vals, 0.0)
-                envelope[i:i + block] = vals
-                note.envelope = float(vals[-1])
-                i += block
-                if note.envelope <= 0.0:
-                    note.envelope = 0.0
-                    note.stage = "off"
-                continue
-
-            if note.stage == "release":
-                if self._release <= 0:
-                    note.envelope = 0.0
-                    note.stage = "off"
-                    continue
-                step = dt / self._release
-                remaining = max(1, int(np.ceil(note.envelope / step)))
-                block = min(num_samples - i, remaining)
-                vals = note.envelope - step * np.arange(1, block + 1, dtype=np.float32)
-                vals = np.maximum(vals, 0.0)
-                envelope[i:i + block] = vals
-                note.envelope = float(vals[-1])
-                i += block
-                if note.envelope <= 0.0:
-                    note.envelope = 0.0
-                    note.stage = "off"
-                continue
-
-            envelope[i:] = 0.0
-            i = num_samples
-
-        return envelope
+        num_samples = len(buffer)
+        if num_samples > self._saturation_buffer.shape[1]:
+            self._saturation_buffer = np.zeros((2, num_samples), dtype=np.float32)
+        x2 = self._saturation_buffer[0, :num_samples]
+        factor = self._saturation_buffer[1, :num_samples]
+        # Pade approximant of tanh: x(27 + x^2) / (27 + 9x^2), which reaches +/-1 at |x| = 3.
+        buffer *= drive
+        np.clip(buffer, -3.0, 3.0, out=buffer)
+        np.multiply(buffer, buffer, out=x2)
+        np.add(x2, 27.0, out=factor)
+        buffer *= factor
+        np.multiply(x2, 9.0, out=factor)
+        factor += 27.0
+        buffer /= factor
+        buffer *= 1.0 / drive
+        return buffer
@@ -3,10 +3,10 @@
 import contextlib
 import os
 import queue
-import threading
 import numpy as np
 from typing import Optional
 
+from audio import dsp
 from piano_player.instruments import DEFAULT_INSTRUMENT, normalize_instrument
 
 _FLUIDSYNTH_MODULE = None
@@ -70,16 +70,30 @@ class SoundFontSynth:
             self._fs = fluidsynth.Synth(samplerate=float(sample_rate))
         self._sfid: Optional[int] = None
         self._instrument = DEFAULT_INSTRUMENT
-        self._notes: set = set()  # Track active notes for UI
-        self._notes_lock = threading.Lock()
+        self._notes: set = set()  # Owned by the audio thread
+        self._active_note_count = 0  # Published for the UI
         self._event_queue: queue.SimpleQueue = queue.SimpleQueue()
         self._output_gain = 1.0
+        self._mono_buffer = np.zeros(0, dtype=np.float32)
+        # Persistent interleaved int16 target for fluid_synth_write_s16; get_samples() would
+        # allocate a fresh ctypes buffer and a bytes copy on every call.
+        self._write_s16 = getattr(fluidsynth, "fluid_synth_write_s16", None)
+        self._stereo_buffer = np.zeros(0, dtype=np.int16)
+        self._stereo_ptr = 0
         # Not using FluidSynth's own audio driver - we pull samples manually
         # Keep FluidSynth global gain conservative to avoid preset-dependent clipping.
         self._fs.setting('synth.gain', 0.65)
         # Tune internal buffers for smoother generation
         self._fs.setting('synth.polyphony', 96)  # Keep headroom for sustain-heavy play
         self._fs.setting('synth.cpu-cores', 2)  # Use multiple cores if available
+        # The reverb and chorus units run on every block even at zero send level; keep them
+        # off unless asked for, since the dry piano/guitar presets don't rely on them.
+        self.set_effects(reverb=False, chorus=False)
+
+    def set_effects(self, reverb: bool = False, chorus: bool = False):
+        """Enable or disable FluidSynth's built-in reverb and chorus units."""
+        self._fs.setting('synth.reverb.active', 1 if reverb else 0)
+        self._fs.setting('synth.chorus.active', 1 if chorus else 0)
 
     def load_soundfont(self, path: str) -> bool:
         """Load a SoundFont file. Returns True on success."""
@@ -149,40 +163,62 @@ class SoundFontSynth:
                 break
             if event_type == "note_on":
                 self._fs.noteon(0, int(a), int(b))
-                with self._notes_lock:
-                    self._notes.add(int(a))
+                self._notes.add(int(a))
                 continue
             if event_type == "note_off":
                 self._fs.noteoff(0, int(a))
-                with self._notes_lock:
-                    self._notes.discard(int(a))
+                self._notes.discard(int(a))
                 continue
             if event_type == "sustain":
                 self._fs.cc(0, 64, 127 if int(a) else 0)
+        self._active_note_count = len(self._notes)
 
     def generate(self, num_samples: int) -> np.ndarray:
-        """Generate audio samples."""
+        """Generate audio samples.
+
+        The returned array is an internal scratch buffer that is overwritten by
+        the next call; callers that keep samples around must copy them.
+        """
+        if num_samples > len(self._mono_buffer):
+            self._mono_buffer = np.zeros(num_samples, dtype=np.float32)
+        mono = self._mono_buffer[:num_samples]
+        self.generate_into(mono)
+        return mono
+
+    def generate_into(self, out: np.ndarray):
+        """Render the next len(out) samples directly into the float32 array `out`."""
         self._drain_event_queue()
-        # FluidSynth generates interleaved stereo int16
-        samples = self._fs.get_samples(num_samples)
-        # Convert to numpy float32 and mix stereo to mono
-        arr = np.frombuffer(samples, dtype=np.int16).astype(np.float32) / 32768.0
-        # Interleaved stereo: [L0, R0, L1, R1, ...]
-        left = arr[0::2]
-        right = arr[1::2]
-        mono = ((left + right) / 2).astype(np.float32)
+        # FluidSynth generates interleaved stereo int16: [L0, R0, L1, R1, ...]
+        arr = self._render_stereo_s16(len(out))
+        # Sum channels straight into float32; the /2 mono average and /32768 scale are folded below.
+        peak = dsp.mix_stereo_s16(out, arr)
+        scale = 1.0 / 65536.0
 
         # Lightweight output gain smoothing to prevent crunchy clipping on bright presets.
-        peak = float(np.max(np.abs(mono)))
+        peak *= scale
         if peak > 1e-9:
             target = min(1.0, 0.94 / peak)
             if target < self._output_gain:
                 self._output_gain += (target - self._output_gain) * 0.35
             else:
                 self._output_gain += (target - self._output_gain) * 0.06
-            mono *= self._output_gain
-
-        return mono
+            scale *= self._output_gain
+        out *= scale
+
+    def _render_stereo_s16(self, frames: int) -> np.ndarray:
+        if 2 * frames > len(self._stereo_buffer):
+            self._stereo_buffer = np.zeros(2 * frames, dtype=np.int16)
+            self._stereo_ptr = self._stereo_buffer.ctypes.data
+        stereo = self._stereo_buffer[:2 * frames]
+        write = self._write_s16
+        if write is None:
+            # frombuffer() over the returned bytes is read-only, which the compiled mixing
+            # kernel rejects; copy into the persistent (writable) buffer instead.
+            stereo[:] = np.frombuffer(self._fs.get_samples(frames), dtype=np.int16)
+            return stereo
+        ptr = self._stereo_ptr
+        write(self._fs.synth, frames, ptr, 0, 2, ptr, 1, 2)
+        return stereo
 
     def cleanup(self):
         """Clean up resources."""
@@ -191,7 +227,5 @@ class SoundFontSynth:
         self._fs.delete()
 
     def active_notes_count(self) -> int:
-        """Return number of currently active notes."""
-        self._drain_event_queue()
-        with self._notes_lock:
-            return len(self._notes)
+        """Return number of active notes as of the last generated buffer."""
+        return self._active_note_count
@@ -1,28 +1,123 @@
 """Falling notes visualization for MIDI playback."""
 
-from dataclasses import dataclass
+import bisect
+from dataclasses import dataclass, field
 import math
+import time
+import numpy as np
 from PyQt6.QtWidgets import QWidget, QMenu
 from PyQt6.QtCore import QTimer, pyqtSignal, Qt
-from PyQt6.QtGui import QPainter, QColor, QBrush, QPen
+from PyQt6.QtGui import QPainter, QPainterPath, QPixmap, QColor, QBrush, QPen
 
 
-@dataclass
+@dataclass(slots=True)
 class NoteEvent:
     """A note with start time, duration, and velocity."""
     note: int
     start_time: float  # seconds
     duration: float    # seconds
     velocity: int
+    # Assigned by FallingNotesWidget when the note is loaded or created; selection refers to
+    # notes by it. Not part of the note's value.
+    id: int = field(default=-1, compare=False, repr=False)
 
 
-@dataclass
+@dataclass(slots=True)
 class SustainEvent:
     """A sustain pedal event."""
     time: float  # seconds
     on: bool     # True = pedal down, False = pedal up
 
 
+# Pitch classes of the black keys (C = 0), and whether each MIDI note is a black key.
+_BLACK_PITCH_CLASSES = frozenset({1, 3, 6, 8, 10})
+_BLACK_MASK = tuple((note % 12) in _BLACK_PITCH_CLASSES for note in range(128))
+
+
+# Playback timeline event kinds; at equal times they fire in this order, so a repeated
+# pitch is released before it is struck again. The exception is a zero-length note, whose
+# own off follows the note-ons at its time (see _rebuild_timeline).
+_EVENT_NOTE_OFF = 0
+_EVENT_SUSTAIN = 1
+_EVENT_NOTE_ON = 2
+
+
+# Note style keys: bit 4 = black key, bit 3 = playing, bits 0-2 = velocity // 16.
+# Keys for white-key notes sort first, so black-key notes are drawn over them.
+_STYLE_ACTIVE = 8
+
+
+def _build_note_styles() -> tuple[tuple[QBrush, QPen], ...]:
+    """Return the (brush, pen) for every note style key."""
+    styles = []
+    for key in range(32):
+        is_black = bool(key & 16)
+        # Color from the middle of the velocity bucket
+        vel_factor = min(127, (key & 7) * 16 + 8) / 127
+        if key & _STYLE_ACTIVE:
+            # Bright color when playing
+            color = QColor(
+                int(80 + vel_factor * 175),
+                int(150 + vel_factor * 105),
+                int(220)
+            )
+        elif is_black:
+            # Dimmer when not yet played
+            color = QColor(
+                int(60 + vel_factor * 80),
+                int(80 + vel_factor * 60),
+                int(140 + vel_factor * 60)
+            )
+        else:
+            color = QColor(
+                int(70 + vel_factor * 100),
+                int(100 + vel_factor * 80),
+                int(180 + vel_factor * 75)
+            )
+        styles.append((QBrush(color), QPen(color.darker(120), 1)))
+    return tuple(styles)
+
+
+_NOTE_STYLES = _build_note_styles()
+
+# Fixed colors and pens for the rest of the roll, built once rather than on every paint.
+_BACKGROUND_COLOR = QColor(20, 20, 25)
+_KEY_GRID_PEN = QPen(QColor(40, 40, 45), 1)
+_BEAT_LINE_PEN = QPen(QColor(50, 50, 60), 1)
+_STEP_LINE_PEN = QPen(QColor(35, 35, 45), 1)
+_NOW_LINE_PEN = QPen(QColor(100, 100, 120), 2)
+_TIME_TEXT_COLOR = QColor(150, 150, 150)
+_PRIMARY_SELECTION_PEN = QPen(QColor(240, 220, 120), 2)
+_SELECTION_PEN = QPen(QColor(200, 190, 110), 2)
+_SELECTION_BOX_BRUSH = QBrush(QColor(80, 140, 220, 50))
+_SELECTION_BOX_PEN = QPen(QColor(80, 140, 220), 1)
+
+
+def _white_key_index(min_note: int) -> tuple[int, ...]:
+    """Return, for each MIDI note, how many white keys lie in [min_note, note)."""
+    index = []
+    white_count = 0
+    for note in range(128):
+        index.append(white_count)
+        if note >= min_note and not _BLACK_MASK[note]:
+            white_count += 1
+    return tuple(index)
+
+
+def _keys_by_white_index(min_note: int, max_note: int,
+                         white_index: tuple[int, ...]) -> dict[int, tuple[int | None, int | None]]:
+    """Return {white key index: (black key straddling its left edge, the white key itself)}."""
+    keys: dict[int, tuple[int | None, int | None]] = {}
+    for note in range(min_note, max_note + 1):
+        black, white = keys.get(white_index[note], (None, None))
+        if _BLACK_MASK[note]:
+            black = note
+        else:
+            white = note
+        keys[white_index[note]] = (black, white)
+    return keys
+
+
 class FallingNotesWidget(QWidget):
     """Visualizes MIDI notes as falling rectangles."""
 
@@ -38,9 +133,15 @@ class FallingNotesWidget(QWidget):
     # Piano range
     MIN_NOTE = 21  # A0
     MAX_NOTE = 108  # C8
-    BLACK_KEYS = {1, 3, 6, 8, 10}
+    BLACK_KEYS = _BLACK_PITCH_CLASSES
+    NUM_WHITE_KEYS = 52
+    WHITE_INDEX = _white_key_index(MIN_NOTE)
+    KEYS_BY_WHITE_INDEX = _keys_by_white_index(MIN_NOTE, MAX_NOTE, WHITE_INDEX)
     DEFAULT_NOTE_DURATION = 0.5
     DEFAULT_VELOCITY = 100
+    PAINT_INTERVAL_MS = 16  # ~60 FPS
+    # The timeline slider and time label don't need frame rate updates (~15 Hz).
+    TIME_CHANGED_INTERVAL = 1.0 / 15.0
 
     def __init__(self, parent=None):
         super().__init__(parent)
@@ -48,9 +149,12 @@ class FallingNotesWidget(QWidget):
         self._sustain_events: list[SustainEvent] = []
         self._current_time = 0.0
         self._playing = False
+        # perf_counter() value corresponding to time 0 of the recording while playing.
+        self._play_origin = 0.0
         self._visible_seconds = 6.0  # How many seconds visible in window
         self._total_duration = 0.0
-        self._selected_ids: set[int] = set()
+        self._next_note_id = 0
+        self._selected_ids: set[int] = set()  # NoteEvent.id values
         self._primary_id: int | None = None
         self._editing_enabled = True
         self._drag_mode: str | None = None
@@ -65,16 +169,58 @@ class FallingNotesWidget(QWidget):
         self._snap_division = 4
         self._bpm = 120
 
-        # Animation timer
+        # Playback timers: one dispatches note/sustain events, the other repaints. Events use
+        # a single-shot timer aimed at the next due event (see _schedule_tick), separate from
+        # painting so slow repaints cannot delay them.
         self._timer = QTimer()
+        self._timer.setSingleShot(True)
+        self._timer.setTimerType(Qt.TimerType.PreciseTimer)
         self._timer.timeout.connect(self._tick)
-
-        # Track which notes are currently sounding (for keyboard)
-        self._active_notes: set[int] = set()
+        self._paint_timer = QTimer()
+        self._paint_timer.setTimerType(Qt.TimerType.PreciseTimer)
+        self._paint_timer.timeout.connect(self._paint_tick)
+        # Playback time last published through time_changed.
+        self._last_time_emit = -math.inf
+        # Playback time of the last paint, and whether an event has changed the roll since.
+        self._painted_time = -math.inf
+        self._frame_dirty = True
+
+        # Track which notes are currently sounding (for keyboard), with the number of
+        # active events holding each pitch
+        self._note_refcount: dict[int, int] = {}
         # Track which specific events are currently active (for visualization)
-        self._active_events: set[int] = set()  # indices into self._notes
-        # Track which sustain events have been triggered
-        self._triggered_sustain_indices: set[int] = set()
+        self._active_mask = np.zeros(0, dtype=bool)  # parallel to self._notes
+        # Playback cursor into the timeline; everything before it has already been handled.
+        self._next_event_idx = 0
+
+        # Per-note x/width in pixels, indexed by MIDI note; rebuilt when the width changes.
+        self._layout_width = -1
+        self._note_x = np.zeros(128, dtype=np.float64)
+        self._note_w = np.zeros(128, dtype=np.float64)
+        self._white_x: list[float] = []
+        # Background fill and white-key grid lines, redrawn only when the size changes.
+        self._background: QPixmap | None = None
+
+        # Note fields as parallel arrays (same order as self._notes) for vectorized culling.
+        # Times stay float64 because they are compared against the playback clock; pitch and
+        # velocity are 7-bit MIDI values.
+        self._note_starts = np.zeros(0, dtype=np.float64)
+        self._note_durations = np.zeros(0, dtype=np.float64)
+        self._note_ends = np.zeros(0, dtype=np.float64)
+        self._note_pitches = np.zeros(0, dtype=np.uint8)
+        self._note_velocities = np.zeros(0, dtype=np.uint8)
+        self._max_note_duration = 0.0
+        self._starts_sorted = True
+        self._sustain_times = np.zeros(0, dtype=np.float64)
+        # Every note-on, note-off and sustain change as one time-ordered sequence of
+        # (time, kind, index into self._notes or self._sustain_events).
+        self._timeline_times = np.zeros(0, dtype=np.float64)
+        self._timeline_kinds = np.zeros(0, dtype=np.int8)
+        self._timeline_items = np.zeros(0, dtype=np.intp)
+        # Idle style key of each note, parallel to self._notes; indexes _NOTE_STYLES.
+        self._note_style_keys = np.zeros(0, dtype=np.uint8)
+        # Set by edits; the arrays above are rebuilt on their next use (_ensure_note_arrays).
+        self._note_arrays_dirty = False
 
         self.setMinimumHeight(140)
         self.setFocusPolicy(Qt.FocusPolicy.StrongFocus)
@@ -82,12 +228,13 @@ class FallingNotesWidget(QWidget):
     def load_events(self, events: list[NoteEvent], sustain_events: list[SustainEvent] | None = None):
         """Load note and sustain events for visualization."""
         self._notes = sorted(events, key=lambda e: e.start_time)
+        for note_event in self._notes:
+            self._assign_note_id(note_event)
         self._sustain_events = sorted(sustain_events or [], key=lambda e: e.time)
-        self._recalculate_total_duration()
+        self._sustain_times = np.fromiter((e.time for e in self._sustain_events), dtype=np.float64)
         self._current_time = 0.0
-        self._active_notes.clear()
-        self._active_events.clear()
-        self._triggered_sustain_indices.clear()
+        self._invalidate_note_arrays()
+        self._recalculate_total_duration()
         self._selected_ids.clear()
         self._primary_id = None
         self._selection_bounds = None
@@ -100,21 +247,28 @@ class FallingNotesWidget(QWidget):
             return
         self._playing = True
         self._current_time = max(0.0, min(self._current_time, self._total_duration))
+        self._play_origin = time.perf_counter() - self._current_time
+        self._last_time_emit = -math.inf
         self._reset_active_state(emit_audio=True)
         self._rebuild_active_state(emit_audio=True)
-        self._timer.start(16)  # ~60 FPS
+        self._schedule_tick()
+        self._paint_timer.start(self.PAINT_INTERVAL_MS)
 
     def stop(self):
         """Stop playback."""
         self._playing = False
         self._timer.stop()
+        self._paint_timer.stop()
+        # Publish the final position so the timeline isn't left a throttle interval behind.
+        self.time_changed.emit(self._current_time)
+        self._last_time_emit = self._current_time
         # Release all active notes and sustain
-        for note in list(self._active_notes):
+        for note in list(self._note_refcount):
             self.note_released.emit(note)
         self.sustain_triggered.emit(False)  # Release sustain on stop
-        self._active_notes.clear()
-        self._active_events.clear()
-        self._triggered_sustain_indices.clear()
+        self._note_refcount.clear()
+        self._active_mask.fill(False)
+        self._next_event_idx = 0
         self.update()
 
     def is_playing(self) -> bool:
@@ -124,8 +278,12 @@ class FallingNotesWidget(QWidget):
         """Seek to a specific time in the recording."""
         self._reset_active_state(emit_audio=self._playing)
         self._current_time = max(0.0, min(time_seconds, self._total_duration))
+        self._play_origin = time.perf_counter() - self._current_time
         self._rebuild_active_state(emit_audio=self._playing)
+        if self._playing:
+            self._schedule_tick()
         self.time_changed.emit(self._current_time)
+        self._last_time_emit = self._current_time
         self.update()
 
     def get_duration(self) -> float:
@@ -143,16 +301,19 @@ class FallingNotesWidget(QWidget):
 
     def clear_events(self):
         """Clear all loaded events."""
+        if self._playing:
+            # Nothing is left to play; finish as if the end had been reached.
+            self.stop()
+            self.playback_finished.emit()
         self._notes = []
         self._sustain_events = []
+        self._sustain_times = np.zeros(0, dtype=np.float64)
         self._current_time = 0.0
-        self._active_notes.clear()
-        self._active_events.clear()
-        self._triggered_sustain_indices.clear()
+        self._total_duration = 0.0
+        self._invalidate_note_arrays()
         self._selected_ids.clear()
         self._primary_id = None
         self._selection_bounds = None
-        self._total_duration = 0.0
         self.update()
         self.events_changed.emit()
 
@@ -198,34 +359,131 @@ class FallingNotesWidget(QWidget):
     def _reset_active_state(self, emit_audio: bool):
         """Clear active state and optionally emit note-off/sustain-off signals."""
         if emit_audio:
-            for note in list(self._active_notes):
+            for note in list(self._note_refcount):
                 self.note_released.emit(note)
             self.sustain_triggered.emit(False)
-        self._active_notes.clear()
-        self._active_events.clear()
-        self._triggered_sustain_indices.clear()
+        self._note_refcount.clear()
+        self._active_mask.fill(False)
+        self._next_event_idx = 0
 
     def _rebuild_active_state(self, emit_audio: bool):
-        """Rebuild active notes/events based on current time."""
+        """Rebuild active notes/events and playback cursors based on current time."""
+        self._ensure_note_arrays()
         sustain_on = False
-        for idx, sustain_event in enumerate(self._sustain_events):
-            if sustain_event.time <= self._current_time:
-                self._triggered_sustain_indices.add(idx)
-                sustain_on = sustain_event.on
-
-        for idx, note_event in enumerate(self._notes):
-            if note_event.start_time <= self._current_time < note_event.start_time + note_event.duration:
-                self._active_events.add(idx)
-                if emit_audio and note_event.note not in self._active_notes:
-                    self._active_notes.add(note_event.note)
-                    self.note_triggered.emit(note_event.note, note_event.velocity)
+        sustain_idx = int(np.searchsorted(self._sustain_times, self._current_time, side="right"))
+        if sustain_idx:
+            sustain_on = self._sustain_events[sustain_idx - 1].on
+        self._next_event_idx = int(np.searchsorted(self._timeline_times, self._current_time, side="right"))
+
+        # The cursor treats every event at exactly the current time as already fired, so a
+        # note is sounding iff its on is at or before now and its off after it, read from the
+        # same arrays the timeline was built from. A zero-length note at now has both events
+        # behind the cursor and stays silent rather than being left on.
+        now = self._current_time
+        lo, hi = self._note_index_range(now, now)
+        sounding = lo + np.flatnonzero((self._note_starts[lo:hi] <= now) & (now < self._note_ends[lo:hi]))
+
+        # Newly sounding pitch -> velocity of its latest-starting event.
+        velocities: dict[int, int] = {}
+        for idx in sounding.tolist():
+            note_event = self._notes[idx]
+            self._active_mask[idx] = True
+            if emit_audio:
+                count = self._note_refcount.get(note_event.note, 0)
+                self._note_refcount[note_event.note] = count + 1
+                if count == 0 or note_event.note in velocities:
+                    velocities[note_event.note] = note_event.velocity
+
+        # One note-on per pitch, however many overlapping events hold it.
+        for note, velocity in velocities.items():
+            self.note_triggered.emit(note, velocity)
 
         if emit_audio and sustain_on:
             self.sustain_triggered.emit(True)
 
+    def _invalidate_note_arrays(self):
+        """Mark the parallel note arrays stale after self._notes changes.
+
+        Rebuilding is deferred to the next paint or tick, so a burst of edits (e.g. mouse
+        moves while dragging) costs one rebuild. During playback the timeline cursor, pitch
+        refcounts and active mask all index the old arrays, so they are resynced at once.
+        This is the only place an edit resets that state; callers must not reset it too.
+        """
+        self._note_arrays_dirty = True
+        if self._playing:
+            self._resync_playback()
+        else:
+            self._reset_active_state(emit_audio=False)
+
+    def _resync_playback(self):
+        """Realign playback state with the current notes at the current time."""
+        self._reset_active_state(emit_audio=True)
+        # The end-of-playback deadline comes from the new notes, not the old ones.
+        self._recalculate_total_duration()
+        self._play_origin = time.perf_counter() - self._current_time
+        self._rebuild_active_state(emit_audio=True)
+        self._schedule_tick()
+
+    def _ensure_note_arrays(self):
+        if self._note_arrays_dirty:
+            self._rebuild_note_arrays()
+
+    def _rebuild_note_arrays(self):
+        """Refresh the parallel note arrays from self._notes."""
+        self._note_arrays_dirty = False
+        count = len(self._notes)
+        # Any edit that rebuilds these arrays also resets the active state.
+        self._active_mask = np.zeros(count, dtype=bool)
+        self._note_starts = np.fromiter((e.start_time for e in self._notes), dtype=np.float64, count=count)
+        self._note_durations = np.fromiter((e.duration for e in self._notes), dtype=np.float64, count=count)
+        self._note_pitches = np.fromiter((e.note for e in self._notes), dtype=np.uint8, count=count)
+        self._note_velocities = np.fromiter((e.velocity for e in self._notes), dtype=np.uint8, count=count)
+        self._max_note_duration = float(self._note_durations.max()) if count else 0.0
+        # Dragging edits start times in place and only re-sorts on release.
+        self._starts_sorted = bool(np.all(self._note_starts[1:] >= self._note_starts[:-1]))
+        self._note_ends = self._note_starts + self._note_durations
+        self._rebuild_timeline()
+        self._rebuild_note_styles()
+
+    def _rebuild_note_styles(self):
+        """Assign each note its idle style key (see _note_style_key); playing adds _STYLE_ACTIVE."""
+        black = np.array(_BLACK_MASK, dtype=np.uint8)[self._note_pitches]
+        self._note_style_keys = (black << 4) | (self._note_velocities >> 4)
+
+    def _rebuild_timeline(self):
+        """Merge note starts, note ends and sustain changes into one time-ordered timeline."""
+        note_count = len(self._notes)
+        sustain_count = len(self._sustain_events)
+        times = np.concatenate((self._note_ends, self._sustain_times, self._note_starts))
+        kinds = np.concatenate((
+            np.full(note_count, _EVENT_NOTE_OFF, dtype=np.int8),
+            np.full(sustain_count, _EVENT_SUSTAIN, dtype=np.int8),
+            np.full(note_count, _EVENT_NOTE_ON, dtype=np.int8),
+        ))
+        items = np.concatenate((np.arange(note_count), np.arange(sustain_count), np.arange(note_count)))
+        # Sort by time, then kind; lexsort is stable, so equal events keep index order.
+        # A zero-length note's off would otherwise precede its own on and be skipped (the
+        # note is not active yet), leaving the note stuck; rank it after the note-ons.
+        ranks = kinds.copy()
+        ranks[:note_count][self._note_ends <= self._note_starts] = _EVENT_NOTE_ON + 1
+        order = np.lexsort((ranks, times))
+        self._timeline_times = times[order]
+        self._timeline_kinds = kinds[order]
+        self._timeline_items = items[order]
+
+    def _note_index_range(self, t0: float, t1: float) -> tuple[int, int]:
+        """Return [lo, hi) bounding every note in self._notes that overlaps [t0, t1]."""
+        self._ensure_note_arrays()
+        if not self._starts_sorted:
+            return 0, len(self._notes)
+        lo = int(np.searchsorted(self._note_starts, t0 - self._max_note_duration, side="left"))
+        hi = int(np.searchsorted(self._note_starts, t1, side="right"))
+        return lo, hi
+
     def _recalculate_total_duration(self):
         if self._notes:
-            self._total_duration = max(e.start_time + e.duration for e in self._notes)
+            self._ensure_note_arrays()
+            self._total_duration = float(self._note_ends.max())
             if self._current_time > self._total_duration:
                 self._current_time = self._total_duration
         else:
@@ -233,50 +491,83 @@ class FallingNotesWidget(QWidget):
             self._current_time = 0.0
 
     def _tick(self):
-        """Animation tick - advance time and trigger notes."""
-        dt = 0.016  # ~60 FPS
-        self._current_time += dt
-        self.time_changed.emit(self._current_time)
-
-        # Check which notes should start/stop
-        for idx, event in enumerate(self._notes):
-            note_end = event.start_time + event.duration
-
-            # Event should start
-            if (event.start_time <= self._current_time < event.start_time + dt
-                    and idx not in self._active_events):
-                self._active_events.add(idx)
-                # Only trigger keyboard note if not already sounding
-                if event.note not in self._active_notes:
-                    self._active_notes.add(event.note)
-                    self.note_triggered.emit(event.note, event.velocity)
-
-            # Event should end
-            if (note_end <= self._current_time < note_end + dt
-                    and idx in self._active_events):
-                self._active_events.discard(idx)
-                # Only release keyboard note if no other active events use it
-                note_still_active = any(
-                    i in self._active_events and self._notes[i].note == event.note
-                    for i in self._active_events
-                )
-                if not note_still_active:
-                    self._active_notes.discard(event.note)
-                    self.note_released.emit(event.note)
-
-        # Check which sustain events should trigger
-        for idx, sustain_event in enumerate(self._sustain_events):
-            if (sustain_event.time <= self._current_time < sustain_event.time + dt
-                    and idx not in self._triggered_sustain_indices):
-                self._triggered_sustain_indices.add(idx)
-                self.sustain_triggered.emit(sustain_event.on)
-
-        self.update()
+        """Playback tick - advance time and trigger notes."""
+        # Follow the wall clock rather than counting timer fires, which drift; every event
+        # between the previous and the new time is handled below however late the tick is.
+        self._current_time = time.perf_counter() - self._play_origin
+        self._ensure_note_arrays()
+
+        # Advance the timeline cursor past everything that is now due, in time order.
+        now = self._current_time
+        times = self._timeline_times
+        count = len(times)
+        if self._next_event_idx < count and times[self._next_event_idx] <= now:
+            self._frame_dirty = True
+        while self._next_event_idx < count and times[self._next_event_idx] <= now:
+            kind = self._timeline_kinds[self._next_event_idx]
+            idx = int(self._timeline_items[self._next_event_idx])
+            self._next_event_idx += 1
+            if kind == _EVENT_NOTE_OFF:
+                if self._active_mask[idx]:
+                    self._end_note_event(idx)
+            elif kind == _EVENT_SUSTAIN:
+                self.sustain_triggered.emit(self._sustain_events[idx].on)
+            elif not self._active_mask[idx]:
+                self._start_note_event(idx)
 
         # Check if playback finished
         if self._current_time > self._total_duration + 0.5:
             self.stop()
             self.playback_finished.emit()
+        else:
+            self._schedule_tick()
+
+    def _schedule_tick(self):
+        """Arm the event timer for the next timeline event (or the end of playback)."""
+        self._ensure_note_arrays()
+        if self._next_event_idx < len(self._timeline_times):
+            next_time = float(self._timeline_times[self._next_event_idx])
+        else:
+            next_time = self._total_duration + 0.5
+        now = time.perf_counter() - self._play_origin
+        # Round up: a timer that fires early just finds nothing due and re-arms itself.
+        delay_ms = math.ceil((next_time - now) * 1000.0)
+        self._timer.start(max(1, delay_ms))
+
+    def _paint_tick(self):
+        """Animation tick - publish the playback time (throttled) and repaint."""
+        # The event timer sleeps between events, so the frame clock advances time itself.
+        self._current_time = time.perf_counter() - self._play_origin
+        if abs(self._current_time - self._last_time_emit) >= self.TIME_CHANGED_INTERVAL:
+            self._last_time_emit = self._current_time
+            self.time_changed.emit(self._current_time)
+        # Playback keeps driving the synth while the roll is hidden or minimized (where
+        # isVisible() stays true); only repainting stops.
+        if not self.isVisible() or self.window().isMinimized():
+            return
+        # Skip frames where the notes would not move by a whole pixel and nothing started or ended.
+        moved = abs(self._current_time - self._painted_time) * self._pixels_per_second(self.height())
+        if self._frame_dirty or moved >= 1.0:
+            self.update()
+
+    def _start_note_event(self, idx: int):
+        event = self._notes[idx]
+        self._active_mask[idx] = True
+        # Only trigger keyboard note if not already sounding
+        count = self._note_refcount.get(event.note, 0)
+        self._note_refcount[event.note] = count + 1
+        if count == 0:
+            self.note_triggered.emit(event.note, event.velocity)
+
+    def _end_note_event(self, idx: int):
+        event = self._notes[idx]
+        self._active_mask[idx] = False
+        # Only release keyboard note if no other active events use it
+        count = self._note_refcount.pop(event.note, 0) - 1
+        if count > 0:
+            self._note_refcount[event.note] = count
+        else:
+            self.note_released.emit(event.note)
 
     def _pixels_per_second(self, height: int) -> float:
         if self._visible_seconds <= 0:
@@ -292,7 +583,7 @@ class FallingNotesWidget(QWidget):
         return now_y - (time_value - self._current_time) * pixels_per_second
 
     def _is_black_key(self, note: int) -> bool:
-        return (note % 12) in self.BLACK_KEYS
+        return _BLACK_MASK[note]
 
     def _snap_time(self, time_value: float) -> float:
         if not self._snap_enabled:
@@ -303,25 +594,30 @@ class FallingNotesWidget(QWidget):
             return time_value
         return round(time_value / step) * step
 
+    def _assign_note_id(self, note_event: NoteEvent):
+        note_event.id = self._next_note_id
+        self._next_note_id += 1
+
     def _is_selected(self, note_event: NoteEvent) -> bool:
-        return id(note_event) in self._selected_ids
+        return note_event.id in self._selected_ids
 
     def _note_at_x(self, x: float, width: int) -> int | None:
         """Return the MIDI note at the given x coordinate."""
+        if width <= 0:
+            return None
+        # Only the white key under x and its neighbours (with the black keys on their edges)
+        # can contain it; checking the neighbours too keeps shared edges going to the lower key.
+        white = int(x // (width / self.NUM_WHITE_KEYS))
+        candidates = [self.KEYS_BY_WHITE_INDEX.get(index, (None, None)) for index in (white - 1, white, white + 1)]
         # Prefer black keys for correct overlap behavior.
-        for note in range(self.MIN_NOTE, self.MAX_NOTE + 1):
-            if not self._is_black_key(note):
-                continue
-            note_x, note_width = self._get_note_x(note, width)
-            if note_x <= x <= note_x + note_width:
-                return note
-
-        for note in range(self.MIN_NOTE, self.MAX_NOTE + 1):
-            if self._is_black_key(note):
-                continue
-            note_x, note_width = self._get_note_x(note, width)
-            if note_x <= x <= note_x + note_width:
-                return note
+        for is_white in (0, 1):
+            for keys in candidates:
+                note = keys[is_white]
+                if note is None:
+                    continue
+                note_x, note_width = self._get_note_x(note, width)
+                if note_x <= x <= note_x + note_width:
+                    return note
 
         return None
 
@@ -332,21 +628,55 @@ class FallingNotesWidget(QWidget):
 
     def _get_note_x(self, note: int, width: float) -> tuple[float, float]:
         """Get x position and width for a note."""
-        # Count white keys up to this note
-        num_white_total = sum(1 for n in range(self.MIN_NOTE, self.MAX_NOTE + 1)
-                              if not self._is_black_key(n))
-        white_width = width / num_white_total
-
-        if self._is_black_key(note):
-            # Black key position based on adjacent white keys
-            white_count = sum(1 for n in range(self.MIN_NOTE, note)
-                              if not self._is_black_key(n))
-            x = white_count * white_width - white_width * 0.3
-            return x, white_width * 0.6
-        else:
-            white_count = sum(1 for n in range(self.MIN_NOTE, note)
-                              if not self._is_black_key(n))
-            return white_count * white_width, white_width
+        if width != self._layout_width:
+            self._rebuild_layout_cache(width)
+        return float(self._note_x[note]), float(self._note_w[note])
+
+    def _rebuild_layout_cache(self, width: float):
+        """Precompute x/width for every note and the white-key grid lines at `width`."""
+        white_width = width / self.NUM_WHITE_KEYS
+        # Pitches outside the piano range are valid MIDI too; they get the same geometry the
+        # per-call computation gave them (stacked at the left edge below A0, continuing past
+        # the right edge above C8), since WHITE_INDEX counts white keys across all 128 notes.
+        for note in range(128):
+            white_count = self.WHITE_INDEX[note]
+            if _BLACK_MASK[note]:
+                # Black key position based on adjacent white keys
+                self._note_x[note] = white_count * white_width - white_width * 0.3
+                self._note_w[note] = white_width * 0.6
+            else:
+                self._note_x[note] = white_count * white_width
+                self._note_w[note] = white_width
+        self._white_x = [white_count * white_width for white_count in range(self.NUM_WHITE_KEYS)]
+        self._layout_width = width
+
+    def resizeEvent(self, event):
+        self._rebuild_layout_cache(self.width())
+        self._background = None
+        super().resizeEvent(event)
+
+    def _background_pixmap(self, width: int, height: int) -> QPixmap:
+        """Return the cached background (fill plus white-key grid lines), rebuilding it if stale."""
+        ratio = self.devicePixelRatioF()
+        background = self._background
+        if (background is not None and background.devicePixelRatio() == ratio
+                and background.width() == int(width * ratio) and background.height() == int(height * ratio)):
+            return background
+        if width != self._layout_width:
+            self._rebuild_layout_cache(width)
+        background = QPixmap(int(width * ratio), int(height * ratio))
+        background.setDevicePixelRatio(ratio)
+        painter = QPainter(background)
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+        # Dark background
+        painter.fillRect(0, 0, width, height, _BACKGROUND_COLOR)
+        # Grid lines for white keys
+        painter.setPen(_KEY_GRID_PEN)
+        for x in self._white_x:
+            painter.drawLine(int(x), 0, int(x), height)
+        painter.end()
+        self._background = background
+        return background
 
     def _note_rect(self, note_event: NoteEvent, width: int, height: int) -> tuple[float, float, float, float]:
         pixels_per_second = self._pixels_per_second(height)
@@ -360,7 +690,10 @@ class FallingNotesWidget(QWidget):
     def _hit_test_note_index(self, x: float, y: float) -> int | None:
         width = self.width()
         height = self.height()
-        for idx in range(len(self._notes) - 1, -1, -1):
+        # Only notes spanning the time under the cursor can contain it (a pixel of slack
+        # on either side keeps the inclusive rect edges).
+        lo, hi = self._note_index_range(self._time_at_y(y + 1, height), self._time_at_y(y - 1, height))
+        for idx in range(hi - 1, lo - 1, -1):
             note_event = self._notes[idx]
             rect_x, rect_y, rect_w, rect_h = self._note_rect(note_event, width, height)
             if rect_x <= x <= rect_x + rect_w and rect_y <= y <= rect_y + rect_h:
@@ -371,10 +704,10 @@ class FallingNotesWidget(QWidget):
         if idx < 0 or idx >= len(self._notes):
             return
         removed = self._notes.pop(idx)
-        self._selected_ids.discard(id(removed))
-        if self._primary_id == id(removed):
+        self._invalidate_note_arrays()
+        self._selected_ids.discard(removed.id)
+        if self._primary_id == removed.id:
             self._primary_id = None
-        self._reset_active_state(emit_audio=False)
         self._recalculate_total_duration()
         self.events_changed.emit()
         self.update()
@@ -382,10 +715,10 @@ class FallingNotesWidget(QWidget):
     def _delete_selected(self):
         if not self._selected_ids:
             return
-        self._notes = [note for note in self._notes if id(note) not in self._selected_ids]
+        self._notes = [note for note in self._notes if note.id not in self._selected_ids]
+        self._invalidate_note_arrays()
         self._selected_ids.clear()
         self._primary_id = None
-        self._reset_active_state(emit_audio=False)
         self._recalculate_total_duration()
         self.events_changed.emit()
         self.update()
@@ -407,11 +740,13 @@ class FallingNotesWidget(QWidget):
             duration=default_duration,
             velocity=self.DEFAULT_VELOCITY,
         )
-        self._notes.append(note_event)
-        self._notes.sort(key=lambda e: e.start_time)
-        self._selected_ids = {id(note_event)}
-        self._primary_id = id(note_event)
-        self._reset_active_state(emit_audio=False)
+        self._assign_note_id(note_event)
+        # self._notes is kept sorted by start time; insert after any notes starting together,
+        # as the stable sort did.
+        bisect.insort(self._notes, note_event, key=lambda e: e.start_time)
+        self._invalidate_note_arrays()
+        self._selected_ids = {note_event.id}
+        self._primary_id = note_event.id
         self._recalculate_total_duration()
         self.events_changed.emit()
         self.update()
@@ -458,7 +793,7 @@ class FallingNotesWidget(QWidget):
         self._drag_originals = [
             (note, note.start_time, note.duration, note.note)
             for note in self._notes
-            if id(note) in self._selected_ids
+            if note.id in self._selected_ids
         ]
 
     def _apply_drag_move(self, x: float, y: float):
@@ -481,7 +816,7 @@ class FallingNotesWidget(QWidget):
 
         anchor_start = None
         for note_event, start_time, _duration, _note in self._drag_originals:
-            if id(note_event) == self._drag_anchor_id:
+            if note_event.id == self._drag_anchor_id:
                 anchor_start = start_time
                 break
         if anchor_start is None and self._drag_originals:
@@ -497,6 +832,7 @@ class FallingNotesWidget(QWidget):
             note_event.start_time = new_start
             note_event.note = new_note
 
+        self._invalidate_note_arrays()
         self.update()
 
     def _apply_drag_resize(self, x: float, y: float):
@@ -512,7 +848,7 @@ class FallingNotesWidget(QWidget):
 
         anchor_end = None
         for note_event, start_time, duration, _note in self._drag_originals:
-            if id(note_event) == self._drag_anchor_id:
+            if note_event.id == self._drag_anchor_id:
                 anchor_end = start_time + duration
                 break
         if anchor_end is None and self._drag_originals:
@@ -527,12 +863,13 @@ class FallingNotesWidget(QWidget):
         for note_event, _start_time, duration, _note in self._drag_originals:
             note_event.duration = max(min_duration, duration + delta_time)
 
+        self._invalidate_note_arrays()
         self.update()
 
     def _finalize_drag(self):
         if self._drag_mode in ("move", "resize"):
             self._notes.sort(key=lambda e: e.start_time)
-            self._reset_active_state(emit_audio=False)
+            self._invalidate_note_arrays()
             self._recalculate_total_duration()
             self.events_changed.emit()
         self._drag_mode = None
@@ -556,7 +893,7 @@ class FallingNotesWidget(QWidget):
             idx = self._hit_test_note_index(x, y)
             if idx is not None:
                 note_event = self._notes[idx]
-                note_id = id(note_event)
+                note_id = note_event.id
                 if shift:
                     if note_id not in self._selected_ids:
                         self._selected_ids.add(note_id)
@@ -631,7 +968,7 @@ class FallingNotesWidget(QWidget):
                 note_end = note_event.start_time + note_event.duration
                 if (note_x <= right and note_x + note_w >= left
                         and note_start <= time_end and note_end >= time_start):
-                    selected.add(id(note_event))
+                    selected.add(note_event.id)
             self._selected_ids = selected
             if self._selected_ids:
                 self._primary_id = next(iter(self._selected_ids))
@@ -698,6 +1035,62 @@ class FallingNotesWidget(QWidget):
         self.seek(self._current_time + delta_seconds)
         event.accept()
 
+    def _paint_notes(self, painter: QPainter, lo: int, hi: int, width: int, height: int,
+                     now_y: float, pixels_per_second: float):
+        """Draw the visible notes among self._notes[lo:hi]."""
+        # Cull in time first: a note is visible if it starts before the top edge's time and
+        # ends after the bottom edge's time, so rejected notes never get y coordinates.
+        time_top = self._current_time + now_y / pixels_per_second
+        time_bottom = self._current_time - (height - now_y) / pixels_per_second
+        visible = lo + np.flatnonzero(
+            (self._note_starts[lo:hi] <= time_top) & (self._note_ends[lo:hi] >= time_bottom)
+        )
+        if not visible.size:
+            return
+
+        # Rectangles for the visible notes at once (notes fall from top), truncated to ints as before.
+        if width != self._layout_width:
+            self._rebuild_layout_cache(width)
+        pitches = self._note_pitches[visible]
+        y_bottom = now_y - (self._note_starts[visible] - self._current_time) * pixels_per_second
+        y_top = y_bottom - self._note_durations[visible] * pixels_per_second
+        rects = zip(
+            (self._note_x[pitches] + 1).astype(np.int64).tolist(),
+            y_top.astype(np.int64).tolist(),
+            (self._note_w[pitches] - 2).astype(np.int64).tolist(),
+            (y_bottom - y_top).astype(np.int64).tolist(),
+        )
+        style_keys = (self._note_style_keys[visible] | (self._active_mask[visible] * _STYLE_ACTIVE)).tolist()
+
+        # Collect the note rectangles into one path per style so each style is drawn in one call.
+        paths: dict[int, QPainterPath] = {}
+        selected_rects = []
+        for idx, rect, key in zip(visible.tolist(), rects, style_keys):
+            note_event = self._notes[idx]
+
+            # Color based on velocity and whether THIS specific event is playing
+            path = paths.get(key)
+            if path is None:
+                path = paths[key] = QPainterPath()
+                # Overlapping notes of one style must not cancel out under the default odd-even fill.
+                path.setFillRule(Qt.FillRule.WindingFill)
+            path.addRoundedRect(*rect, 3, 3)
+            if self._is_selected(note_event):
+                selected_rects.append((rect, note_event.id == self._primary_id))
+
+        # White-key styles sort first, so black-key notes are drawn on top of their neighbours.
+        for key in sorted(paths):
+            brush, pen = _NOTE_STYLES[key]
+            painter.setBrush(brush)
+            painter.setPen(pen)
+            painter.drawPath(paths[key])
+
+        if selected_rects:
+            painter.setBrush(Qt.BrushStyle.NoBrush)
+            for rect, is_primary in selected_rects:
+                painter.setPen(_PRIMARY_SELECTION_PEN if is_primary else _SELECTION_PEN)
+                painter.drawRoundedRect(*rect, 3, 3)
+
     def paintEvent(self, event):
         """Draw the falling notes."""
         painter = QPainter(self)
@@ -705,21 +1098,11 @@ class FallingNotesWidget(QWidget):
 
         width = self.width()
         height = self.height()
+        self._painted_time = self._current_time
+        self._frame_dirty = False
 
-        # Dark background
-        painter.fillRect(0, 0, width, height, QColor(20, 20, 25))
-
-        # Draw grid lines for white keys
-        num_white = sum(1 for n in range(self.MIN_NOTE, self.MAX_NOTE + 1)
-                        if not self._is_black_key(n))
-        white_width = width / num_white
-        painter.setPen(QPen(QColor(40, 40, 45), 1))
-        white_idx = 0
-        for note in range(self.MIN_NOTE, self.MAX_NOTE + 1):
-            if not self._is_black_key(note):
-                x = white_idx * white_width
-                painter.drawLine(int(x), 0, int(x), height)
-                white_idx += 1
+        # Dark background and white-key grid lines
+        painter.drawPixmap(0, 0, self._background_pixmap(width, height))
 
         pixels_per_second = self._pixels_per_second(height)
         now_y = self._now_y(height)
@@ -739,75 +1122,26 @@ class FallingNotesWidget(QWidget):
                     y = self._time_to_y(t, height)
                     if 0 <= y <= height:
                         is_beat = beat_duration > 0 and abs((t / beat_duration) - round(t / beat_duration)) < 1e-6
-                        color = QColor(50, 50, 60) if is_beat else QColor(35, 35, 45)
-                        painter.setPen(QPen(color, 1))
+                        painter.setPen(_BEAT_LINE_PEN if is_beat else _STEP_LINE_PEN)
                         painter.drawLine(0, int(y), width, int(y))
                     t += step_duration
 
         # Draw "now" line at bottom
-        painter.setPen(QPen(QColor(100, 100, 120), 2))
+        painter.setPen(_NOW_LINE_PEN)
         painter.drawLine(0, now_y, width, now_y)
 
-        for idx, note_event in enumerate(self._notes):
-            # Calculate y position (notes fall from top)
-            time_until_hit = note_event.start_time - self._current_time
-            y_bottom = now_y - (time_until_hit * pixels_per_second)
-            y_top = y_bottom - (note_event.duration * pixels_per_second)
-
-            # Skip if not visible
-            if y_bottom < 0 or y_top > height:
-                continue
-
-            x, note_width = self._get_note_x(note_event.note, width)
-
-            # Color based on velocity and whether THIS specific event is playing
-            is_active = idx in self._active_events
-            vel_factor = note_event.velocity / 127
-
-            if is_active:
-                # Bright color when playing
-                color = QColor(
-                    int(80 + vel_factor * 175),
-                    int(150 + vel_factor * 105),
-                    int(220)
-                )
-            else:
-                # Dimmer when not yet played
-                if self._is_black_key(note_event.note):
-                    color = QColor(
-                        int(60 + vel_factor * 80),
-                        int(80 + vel_factor * 60),
-                        int(140 + vel_factor * 60)
-                    )
-                else:
-                    color = QColor(
-                        int(70 + vel_factor * 100),
-                        int(100 + vel_factor * 80),
-                        int(180 + vel_factor * 75)
-                    )
-
-            # Draw the note rectangle
-            painter.setBrush(QBrush(color))
-            painter.setPen(QPen(color.darker(120), 1))
-            painter.drawRoundedRect(
-                int(x + 1), int(y_top),
-                int(note_width - 2), int(y_bottom - y_top),
-                3, 3
-            )
-            if self._is_selected(note_event):
-                painter.setBrush(Qt.BrushStyle.NoBrush)
-                highlight = QColor(240, 220, 120) if id(note_event) == self._primary_id else QColor(200, 190, 110)
-                painter.setPen(QPen(highlight, 2))
-                painter.drawRoundedRect(
-                    int(x + 1), int(y_top),
-                    int(note_width - 2), int(y_bottom - y_top),
-                    3, 3
-                )
+        # Only notes overlapping the visible time span (plus a pixel of slack) can be drawn.
+        lo, hi = self._note_index_range(
+            self._current_time - (height - now_y + 1) / pixels_per_second,
+            self._current_time + (now_y + 1) / pixels_per_second,
+        )
+        if lo < hi:
+            self._paint_notes(painter, lo, hi, width, height, now_y, pixels_per_second)
 
         # Draw current time
         if self._total_duration > 0:
             time_text = f"{self._current_time:.1f}s / {self._total_duration:.1f}s"
-            painter.setPen(QColor(150, 150, 150))
+            painter.setPen(_TIME_TEXT_COLOR)
             painter.drawText(10, 20, time_text)
 
         if self._selection_bounds:
@@ -816,8 +1150,8 @@ class FallingNotesWidget(QWidget):
             y0 = self._time_to_y(t0, height)
             y1 = self._time_to_y(t1, height)
             top, bottom = sorted((y0, y1))
-            painter.setBrush(QBrush(QColor(80, 140, 220, 50)))
-            painter.setPen(QPen(QColor(80, 140, 220), 1))
+            painter.setBrush(_SELECTION_BOX_BRUSH)
+            painter.setPen(_SELECTION_BOX_PEN)
             painter.drawRect(int(left), int(top), int(right - left), int(bottom - top))
 
         painter.end()
@@ -813,6 +813,7 @@ class PianoPlayerController(QObject):
         self._window.set_diagnostics(stats)
 
     def start(self):
+        self._engine.warm_up()
         self._engine.start()
         self._window.show()
         self._debug_timer = QTimer(self)
@@ -836,6 +837,7 @@ class PianoPlayerController(QObject):
         else:
             self._window.set_midi_status(False)
         self._refresh_device_lists()
+        AudioEngine.post_init_freeze()
 
     def _autoload_preferred_soundfont(self):
         if not self._autoload_sampled or self._synth_name in self.SAMPLED_SYNTHS:
@@ -0,0 +1,146 @@
+"""Playback event dispatch of FallingNotesWidget, driven by a fake clock."""
+
+import os
+
+import pytest
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+QtWidgets = pytest.importorskip("PyQt6.QtWidgets")
+
+from gui import falling_notes_widget  # noqa: E402
+from gui.falling_notes_widget import FallingNotesWidget, NoteEvent  # noqa: E402
+
+
+class _FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def perf_counter(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = _FakeClock()
+    monkeypatch.setattr(falling_notes_widget, "time", fake)
+    return fake
+
+
+@pytest.fixture
+def widget():
+    app = QtWidgets.QApplication.instance() or QtWidgets.QApplication([])
+    widget = FallingNotesWidget()
+    yield widget
+    widget.stop()
+    app.processEvents()
+
+
+def _record(widget: FallingNotesWidget) -> list[tuple]:
+    log: list[tuple] = []
+    widget.note_triggered.connect(lambda note, velocity: log.append(("on", note)))
+    widget.note_released.connect(lambda note: log.append(("off", note)))
+    return log
+
+
+def _play_until(widget: FallingNotesWidget, clock: _FakeClock, end: float, step: float = 0.016):
+    while clock.now < end and widget.is_playing():
+        clock.now += step
+        widget._tick()
+
+
+def test_zero_duration_note_is_triggered_and_released_once(widget, clock):
+    log = _record(widget)
+    widget.load_events([
+        NoteEvent(note=60, start_time=0.5, duration=0.0, velocity=90),
+        NoteEvent(note=62, start_time=0.5, duration=0.2, velocity=90),
+        NoteEvent(note=60, start_time=1.0, duration=0.3, velocity=80),
+    ])
+    widget.play()
+    _play_until(widget, clock, 3.0)
+
+    assert log == [("on", 60), ("on", 62), ("off", 60), ("off", 62), ("on", 60), ("off", 60)]
+    assert not widget._note_refcount
+
+
+def test_seek_onto_zero_duration_note_leaves_nothing_sounding(widget, clock):
+    log = _record(widget)
+    widget.load_events([
+        NoteEvent(note=60, start_time=0.5, duration=0.0, velocity=90),
+        NoteEvent(note=60, start_time=1.0, duration=0.3, velocity=80),
+    ])
+    widget.play()
+    clock.now = 0.5
+    widget.seek(0.5)
+    assert log == []
+    _play_until(widget, clock, 3.0)
+
+    assert log == [("on", 60), ("off", 60)]
+    assert not widget._note_refcount
+
+
+def test_editing_during_playback_keeps_notes_balanced(widget, clock):
+    log = _record(widget)
+    widget.load_events([
+        NoteEvent(note=60, start_time=0.0, duration=1.0, velocity=90),
+        NoteEvent(note=64, start_time=0.5, duration=1.0, velocity=90),
+        NoteEvent(note=67, start_time=2.0, duration=0.5, velocity=90),
+    ])
+    widget.play()
+    _play_until(widget, clock, 0.7)
+    assert log == [("on", 60), ("on", 64)]
+
+    # Deleting the first note releases what was sounding and resumes from the same time.
+    pedal = []
+    widget.sustain_triggered.connect(pedal.append)
+    widget._delete_note_index(0)
+    assert log[2:] == [("off", 60), ("off", 64), ("on", 64)]
+    assert pedal == [False]
+    _play_until(widget, clock, 4.0)
+    assert log[5:] == [("off", 64), ("on", 67), ("off", 67)]
+    assert not widget._note_refcount
+
+
+def test_loading_during_playback_restarts_from_zero(widget, clock):
+    log = _record(widget)
+    widget.load_events([NoteEvent(note=60, start_time=0.0, duration=2.0, velocity=90)])
+    widget.play()
+    _play_until(widget, clock, 1.0)
+
+    widget.load_events([NoteEvent(note=62, start_time=0.5, duration=0.5, velocity=90)])
+    assert log == [("on", 60), ("off", 60)]
+    start = clock.now
+    _play_until(widget, clock, start + 0.4)
+    assert log[2:] == []
+    _play_until(widget, clock, start + 3.0)
+    assert log[2:] == [("on", 62), ("off", 62)]
+    assert not widget._note_refcount
+
+
+@pytest.mark.parametrize("note", [0, 20, 109, 127])
+def test_notes_outside_piano_range_keep_key_geometry(widget, note):
+    width = 1040
+    white_width = width / FallingNotesWidget.NUM_WHITE_KEYS
+    x, note_width = widget._get_note_x(note, width)
+    is_black = (note % 12) in FallingNotesWidget.BLACK_KEYS
+    assert note_width == pytest.approx(white_width * (0.6 if is_black else 1.0))
+    if note < FallingNotesWidget.MIN_NOTE:
+        assert x <= 0.0
+    else:
+        assert x >= width - white_width
+
+
+def test_clearing_during_playback_stops(widget, clock):
+    log = _record(widget)
+    finished = []
+    widget.playback_finished.connect(lambda: finished.append(True))
+    widget.load_events([NoteEvent(note=60, start_time=0.0, duration=5.0, velocity=90)])
+    widget.play()
+    _play_until(widget, clock, 1.0)
+
+    widget.clear_events()
+    assert not widget.is_playing()
+    assert finished == [True]
+    assert log == [("on", 60), ("off", 60)]
+    assert widget.get_current_time() == 0.0
+    assert widget.get_duration() == 0.0
+    assert not widget._note_refcount
@@ -0,0 +1,54 @@
+"""SoundFontSynth rendering against a stand-in fluidsynth module."""
+
+import ctypes
+import types
+
+import numpy as np
+import pytest
+
+from audio import soundfont_synth
+
+
+FRAMES = 64
+
+
+def _stereo_pattern(frames: int) -> np.ndarray:
+    left = np.arange(frames, dtype=np.int16) * 100
+    return np.stack((left, -left // 2), axis=1).reshape(-1)
+
+
+class _FakeSynth:
+    def __init__(self, samplerate: float):
+        self.synth = object()
+
+    def setting(self, name, value):
+        pass
+
+    def get_samples(self, frames: int) -> bytes:
+        return _stereo_pattern(frames).tobytes()
+
+
+def _write_s16(synth, frames, lptr, loff, lincr, rptr, roff, rincr):
+    target = np.ctypeslib.as_array((ctypes.c_int16 * (2 * frames)).from_address(lptr))
+    target[:] = _stereo_pattern(frames)
+
+
+def _fake_fluidsynth(with_write_s16: bool):
+    module = types.SimpleNamespace(Synth=_FakeSynth)
+    if with_write_s16:
+        module.fluid_synth_write_s16 = _write_s16
+    return module
+
+
+@pytest.mark.parametrize("with_write_s16", [True, False], ids=["write_s16", "get_samples"])
+def test_generate_mixes_stereo_to_mono(monkeypatch, with_write_s16):
+    monkeypatch.setattr(soundfont_synth, "_FLUIDSYNTH_MODULE", _fake_fluidsynth(with_write_s16))
+    synth = soundfont_synth.SoundFontSynth()
+    assert (synth._write_s16 is None) == (not with_write_s16)
+
+    # Quiet enough that the output gain stays at unity.
+    expected = _stereo_pattern(FRAMES).astype(np.float64).reshape(-1, 2).sum(axis=1) / 65536.0
+    for _ in range(2):  # the second call reuses the persistent buffers
+        out = synth.generate(FRAMES)
+        np.testing.assert_allclose(out, expected, rtol=1e-6)
+        assert synth._output_gain == 1.0